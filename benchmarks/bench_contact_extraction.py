@@ -0,0 +1,138 @@
+# bench_contact_extraction.py
+"""
+Micro-benchmark: per-document contact extraction time.
+
+Compares the single-pass resume_work.contact_extraction.extract_contacts
+with the previous per-field implementation from ResumeParser.parse_pdfs,
+and checks that both return the same fields.
+
+    python benchmarks/bench_contact_extraction.py --docs 2000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_work.contact_extraction import extract_contacts
+
+
+# --- Previous implementation (kept here as the baseline) ---
+def _legacy_normalize_phone(num):
+    digits = re.sub(r'\D', '', num)
+    if digits.startswith("977") and len(digits) == 13:
+        return "+977" + digits[3:]
+    elif len(digits) == 10:
+        return digits
+    return None
+
+
+def legacy_extract_contacts(text):
+    def extract_linkedin(text):
+        url_match = re.search(r'https?://(?:www\.)?linkedin\.com/in/[\w-]+', text, re.IGNORECASE)
+        if url_match:
+            return url_match.group(0)
+        partial_match = re.search(r'linkedin\.com/in/[\w-]+', text, re.IGNORECASE)
+        if partial_match:
+            return f"https://{partial_match.group(0)}"
+        handle_match = re.search(r'linkedin[^\w]*[:\s][^\w]*([\w-]{5,})', text, re.IGNORECASE)
+        if handle_match:
+            return f"https://linkedin.com/in/{handle_match.group(1).strip()}"
+        return ""
+
+    def extract_github(text):
+        url_match = re.search(r'https?://(?:www\.)?github\.com/[\w-]+', text, re.IGNORECASE)
+        if url_match:
+            return url_match.group(0)
+        partial_match = re.search(r'github\.com/[\w-]+', text, re.IGNORECASE)
+        if partial_match:
+            return f"https://{partial_match.group(0)}"
+        handle_match = re.search(r'git(?:hub)?[^\w]*[:\s][^\w]*([\w-]{3,})', text, re.IGNORECASE)
+        if handle_match:
+            return f"https://github.com/{handle_match.group(1).strip()}"
+        return ""
+
+    phone_raw = re.findall(r'(\+?977\d{10}|\b\d{10}\b)', text)
+    phones = [_legacy_normalize_phone(p) for p in phone_raw if _legacy_normalize_phone(p)]
+    emails = re.findall(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+', text)
+    name = None
+    for line in text.splitlines():
+        if 'name' in line.lower():
+            name = line.split(":")[-1].strip()
+            break
+    if not name:
+        for line in text.splitlines():
+            if line.strip():
+                name = line.strip()
+                break
+    return {
+        "Name": name or "Unknown",
+        "Email": ',  '.join(emails) or "Unknown",
+        "Phone": ',  '.join(phones),
+        "LinkedIn": extract_linkedin(text) or "Unknown",
+        "GitHub": extract_github(text) or "Unknown",
+    }
+
+
+# --- Synthetic resumes ---
+FIRST = ["Aarav", "Sita", "Ram", "Priya", "John", "Maya", "Bikash", "Anita"]
+LAST = ["Sharma", "Thapa", "Shrestha", "Gurung", "Smith", "Karki", "Rai", "Joshi"]
+FILLER = ("Experienced software engineer with a background in Python, Django, REST APIs, "
+          "PostgreSQL and AWS. Led a team of five, shipped data pipelines and dashboards. ")
+
+
+def synthetic_resume(rng):
+    first, last = rng.choice(FIRST), rng.choice(LAST)
+    handle = f"{first.lower()}{last.lower()}{rng.randint(1, 99)}"
+    header = [f"{first} {last}"]
+    if rng.random() < 0.5:
+        header = [f"Full Name: {first} {last}"]
+    header.append(f"Email: {handle}@example.com")
+    phone = f"{rng.choice(['+977', ''])}98{rng.randint(10000000, 99999999)}"
+    header.append(f"{rng.choice(['Phone', 'Mobile', 'Contact', 'Git'])}: {phone}")
+    if rng.random() < 0.7:
+        header.append(rng.choice([f"https://www.linkedin.com/in/{handle}", f"LinkedIn: {handle}",
+                                  f"LinkedIn: linkedin.com/in/{handle}"]))
+    if rng.random() < 0.6:
+        header.append(rng.choice([f"https://github.com/{handle}", f"github.com/{handle}", f"GitHub: {handle}",
+                                  f"GitHub: github.com/{handle}", f"Git: https://github.com/{handle}"]))
+    body = [FILLER * rng.randint(5, 40) for _ in range(rng.randint(2, 6))]
+    return "\n".join(header + [""] + body)
+
+
+def bench(func, docs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            func(doc)
+        best = min(best, time.perf_counter() - start)
+    return best / len(docs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [synthetic_resume(rng) for _ in range(args.docs)]
+    avg_chars = sum(map(len, docs)) / len(docs)
+
+    mismatches = sum(legacy_extract_contacts(d) != extract_contacts(d) for d in docs)
+    legacy = bench(legacy_extract_contacts, docs, args.repeat)
+    single = bench(extract_contacts, docs, args.repeat)
+
+    print(f"{args.docs} synthetic resumes, {avg_chars:,.0f} chars on average")
+    print(f"  legacy per-field regexes : {legacy * 1e6:8.1f} µs/doc")
+    print(f"  single-pass extraction   : {single * 1e6:8.1f} µs/doc  ({legacy / single:.1f}x)")
+    print(f"  field mismatches         : {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
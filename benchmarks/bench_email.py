@@ -0,0 +1,89 @@
+# bench_email.py
+"""
+Bulk email throughput of the SMTP backend against a local aiosmtpd server.
+
+    pip install aiosmtpd
+    python benchmarks/bench_email.py --messages 200 --workers 1 4 8 --latency-ms 50 --fail-rate 0.05
+
+The stand-in server accepts every message after ``--latency-ms`` and answers
+a ``--fail-rate`` share of them with a transient 451, so retries, pooling and
+rate limiting can be checked without a real mail server.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiosmtpd.controller import Controller
+
+from resume_work.email_sender import SENT, SMTPEmailSender
+
+
+class StandInHandler:
+    def __init__(self, latency: float, fail_rate: float, seed: int = 7):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.delivered = 0
+        self.connections = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        if self.rng.random() < self.fail_rate:
+            return "451 4.3.0 Try again later"
+        self.delivered += 1
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--rate", type=float, default=0, help="Sends per second (0: unlimited)")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    handler = StandInHandler(args.latency_ms / 1000, args.fail_rate)
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        messages = [
+            {"recipient_email": f"candidate{i}@example.com", "subject": "Interview invitation",
+             "body": f"Dear Candidate {i},\n\nWe would like to invite you to an interview."}
+            for i in range(args.messages)
+        ]
+        for workers in args.workers:
+            handler.delivered = handler.connections = 0
+            sender = SMTPEmailSender("hiring@example.com", host="127.0.0.1", port=controller.port,
+                                     max_connections=workers)
+            start = time.perf_counter()
+            statuses = sender.send_bulk(messages, rate=args.rate, backoff=0.05)
+            elapsed = time.perf_counter() - start
+            sender.close()
+            sent = sum(status["status"] == SENT for status in statuses)
+            retries = sum(status["attempts"] - 1 for status in statuses)
+            print(f"  workers {workers:>3}  {elapsed:7.2f}s  {len(messages) / elapsed:7.1f} msgs/s  "
+                  f"sent {sent}/{len(messages)}  retries {retries}  connections {handler.connections}")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
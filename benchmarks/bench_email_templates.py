@@ -0,0 +1,77 @@
+# bench_email_templates.py
+"""
+Email personalisation throughput: per-row str.format over DataFrame.iterrows()
+(the previous send_bulk_emails loop) versus EmailTemplate.render.
+
+    python benchmarks/bench_email_templates.py --rows 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from resume_work.email_sender import DEFAULT_EMAIL_TEMPLATE
+from resume_work.email_templates import EmailTemplate
+
+HTML_BODY = ("<p>Dear {candidate_name},</p><p>Thank you for applying for the {position} position at "
+             "{company_name}. Your match score was <b>{score:.1f}</b> ({keywords_matched}).</p>")
+
+
+def candidates(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    skills = ["Python", "Django", "AWS", "Docker", "SQL", "React", "Kubernetes"]
+    return pd.DataFrame({
+        "Name": [f"Candidate {i}" for i in range(rows)],
+        "Email": [f"candidate{i}@example.com" for i in range(rows)],
+        "Overall Match Score": [round(rng.uniform(30, 95), 1) for _ in range(rows)],
+        "Keywords Matched": [", ".join(rng.sample(skills, 3)) for _ in range(rows)],
+    })
+
+
+def render_iterrows(df: pd.DataFrame, template: dict, position: str):
+    rendered = []
+    for _, candidate in df.iterrows():
+        body = template["body"].format(candidate_name=candidate.get("Name", "Candidate"),
+                                       position=position, company_name="Bitskraft")
+        subject = template["subject"].format(position=position)
+        html_body = HTML_BODY.format(candidate_name=candidate.get("Name", "Candidate"), position=position,
+                                     company_name="Bitskraft", score=candidate["Overall Match Score"],
+                                     keywords_matched=candidate["Keywords Matched"])
+        rendered.append((subject, body, html_body))
+    return rendered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = candidates(args.rows)
+    position = "Backend Engineer"
+
+    best = min(_timed(lambda: render_iterrows(df, DEFAULT_EMAIL_TEMPLATE, position)) for _ in range(args.repeat))
+    print(f"  iterrows + str.format   {best:7.3f}s  {args.rows / best:10.0f} renders/s")
+
+    start = time.perf_counter()
+    template = EmailTemplate(DEFAULT_EMAIL_TEMPLATE["subject"], DEFAULT_EMAIL_TEMPLATE["body"], HTML_BODY)
+    template.validate(df.columns, {"position": position})
+    compile_s = time.perf_counter() - start
+    best = min(_timed(lambda: template.render(df, {"position": position})) for _ in range(args.repeat))
+    print(f"  EmailTemplate.render    {best:7.3f}s  {args.rows / best:10.0f} renders/s  "
+          f"(compile + validate {compile_s * 1000:.2f} ms)")
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
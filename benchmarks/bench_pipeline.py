@@ -0,0 +1,242 @@
+# bench_pipeline.py
+"""
+Throughput, latency and peak memory of the resume pipeline on synthetic corpora.
+
+    python benchmarks/bench_pipeline.py --sizes 10 100 1000 --json results.json
+    python benchmarks/bench_pipeline.py --sizes 100 --compare results.json
+
+Benchmarks (each size/benchmark pair runs in a fresh process so peak RSS is
+its own):
+  extract_text     text_extraction.extract_text, one document at a time
+  analyze_resume   UniversalResumeAnalyzer.analyze_resume per document
+  score_batch      UniversalResumeAnalyzer.score_batch over all extracted texts at once
+  batch_analyze    streaming batch_analyze over the whole corpus
+  parse_pdfs       ResumeParser.parse_pdfs on a folder of the corpus PDFs
+
+Benchmarks that need the embedding model are reported as skipped when it
+cannot be loaded. Results carry the git commit so runs can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+BENCHMARKS = ("extract_text", "analyze_resume", "score_batch", "batch_analyze", "parse_pdfs")
+JOB_DESCRIPTION = ("Backend engineer with 3+ years of Python, Django and PostgreSQL, "
+                   "REST API design, Docker and AWS; CI/CD and Kubernetes a plus.")
+
+
+def _peak_rss_mb():
+    """Peak RSS of this process and of its (pool worker) children, in MB."""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+
+def _latency_stats(latencies):
+    ordered = sorted(latencies)
+    return {
+        "latency_p50_ms": statistics.median(ordered) * 1000,
+        "latency_p95_ms": ordered[max(0, int(len(ordered) * 0.95) - 1)] * 1000,
+    }
+
+
+def _corpus_dir(base, size, seed):
+    """Folder holding exactly ``size`` corpus files, hard-linked from a shared pool."""
+    from corpus import generate_corpus
+    pool = generate_corpus(os.path.join(base, f"pool-{seed}"), size, seed)
+    folder = os.path.join(base, f"n{size}-{seed}")
+    os.makedirs(folder, exist_ok=True)
+    for item in pool:
+        target = os.path.join(folder, os.path.basename(item["path"]))
+        if not os.path.exists(target):
+            try:
+                os.link(item["path"], target)
+            except OSError:
+                with open(item["path"], "rb") as src, open(target, "wb") as dst:
+                    dst.write(src.read())
+    return [dict(item, path=os.path.join(folder, os.path.basename(item["path"]))) for item in pool], folder
+
+
+def _format(path):
+    return "docx" if path.endswith(".docx") else "pdf"
+
+
+def run_benchmark(name, corpus, folder, workers):
+    """Runs inside the child process; returns the measured fields."""
+    stages = {}
+    if name == "extract_text":
+        from resume_work import text_extraction
+        latencies, chars = [], 0
+        for item in corpus:
+            with open(item["path"], "rb") as f:
+                content = f.read()
+            start = time.perf_counter()
+            chars += len(text_extraction.extract_text(content, _format(item["path"])))
+            latencies.append(time.perf_counter() - start)
+        return {"total_s": sum(latencies), "chars": chars, **_latency_stats(latencies)}
+
+    if name == "parse_pdfs":
+        from resume_work.resume_Parse import ResumeParser
+        out = os.path.join(tempfile.mkdtemp(prefix="bench-parse-"), "candidates.csv")
+        parser = ResumeParser(save_dir=folder, output_file=out)
+        start = time.perf_counter()
+        parser.parse_pdfs(workers=workers, incremental=False)
+        return {"total_s": time.perf_counter() - start, "parsed": len(parser.data)}
+
+    from model_handling import UniversalResumeAnalyzer
+    start = time.perf_counter()
+    analyzer = UniversalResumeAnalyzer()
+    stages["model_load_s"] = time.perf_counter() - start
+    start = time.perf_counter()
+    job = analyzer.prepare_job(JOB_DESCRIPTION)
+    stages["prepare_job_s"] = time.perf_counter() - start
+
+    if name in ("analyze_resume", "score_batch"):
+        from resume_work import text_extraction
+        texts = []
+        start = time.perf_counter()
+        for item in corpus:
+            with open(item["path"], "rb") as f:
+                texts.append(text_extraction.extract_text(f.read(), _format(item["path"])))
+        stages["extract_s"] = time.perf_counter() - start
+        if name == "score_batch":
+            start = time.perf_counter()
+            analyzer.score_batch(texts, job)
+            stages["score_s"] = time.perf_counter() - start
+            return {"total_s": stages["extract_s"] + stages["score_s"], "stages": stages}
+        latencies = []
+        for text in texts:
+            start = time.perf_counter()
+            analyzer.analyze_resume(text, job)
+            latencies.append(time.perf_counter() - start)
+        stages["analyze_s"] = sum(latencies)
+        return {"total_s": stages["extract_s"] + stages["analyze_s"], "stages": stages,
+                **_latency_stats(latencies)}
+
+    def read():
+        for item in corpus:
+            with open(item["path"], "rb") as f:
+                yield f.read(), _format(item["path"]), item["path"]
+
+    first_result = None
+    start = time.perf_counter()
+    failed = 0
+    for result in analyzer.batch_analyze(read(), job, workers=workers):
+        first_result = first_result or time.perf_counter() - start
+        failed += bool(result.get("Error"))
+    stages["time_to_first_result_s"] = first_result
+    return {"total_s": time.perf_counter() - start, "failed": failed, "stages": stages}
+
+
+def child_main(args):
+    corpus, folder = _corpus_dir(args.corpus_dir, args.child_size, args.seed)
+    try:
+        fields = run_benchmark(args.child, corpus, folder, args.workers)
+        status = "ok"
+    except ImportError as e:
+        fields, status = {"reason": str(e)}, "skipped"
+    own, children = _peak_rss_mb()
+    from resume_work.metrics import METRICS
+    result = {"benchmark": args.child, "docs": len(corpus), "status": status,
+              "peak_rss_mb": own, "peak_rss_children_mb": children, **fields,
+              "stage_timings": METRICS.summary()}
+    if status == "ok":
+        result["docs_per_s"] = len(corpus) / result["total_s"] if result["total_s"] else None
+    print(json.dumps(result))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = {(r["benchmark"], r["docs"]): r for r in baseline["results"] if r.get("status") == "ok"}
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    for result in results:
+        old = before.get((result["benchmark"], result["docs"]))
+        if old and result.get("status") == "ok":
+            change = result["total_s"] / old["total_s"] - 1 if old["total_s"] else 0.0
+            print(f"  {result['benchmark']:<15} {result['docs']:>6} docs  "
+                  f"{old['total_s']:8.2f}s -> {result['total_s']:8.2f}s  ({change:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--workers", type=int, default=None, help="Extraction processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "cv-scanner-bench"))
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Earlier --json output to compare against")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args)
+        return
+
+    results = []
+    for size in args.sizes:
+        print(f"Generating/reusing corpus of {size} resumes in {args.corpus_dir} ...")
+        _corpus_dir(args.corpus_dir, size, args.seed)
+        for name in args.benchmarks:
+            command = [sys.executable, os.path.abspath(__file__), "--child", name, "--child-size", str(size),
+                       "--seed", str(args.seed), "--corpus-dir", args.corpus_dir]
+            if args.workers:
+                command += ["--workers", str(args.workers)]
+            proc = subprocess.run(command, capture_output=True, text=True)
+            lines = proc.stdout.strip().splitlines()
+            if proc.returncode != 0 or not lines:
+                error = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+                result = {"benchmark": name, "docs": size, "status": "error", "reason": error}
+            else:
+                result = json.loads(lines[-1])
+            results.append(result)
+
+            if result["status"] == "ok":
+                latency = f"  p50 {result['latency_p50_ms']:7.1f} ms" if "latency_p50_ms" in result else ""
+                print(f"  {name:<15} {size:>6} docs  {result['total_s']:8.2f}s  "
+                      f"{result['docs_per_s']:8.1f} docs/s{latency}  peak RSS {result['peak_rss_mb']:.0f} MB "
+                      f"(+{result['peak_rss_children_mb']:.0f} MB workers)")
+            else:
+                print(f"  {name:<15} {size:>6} docs  {result['status']}: {result.get('reason')}")
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
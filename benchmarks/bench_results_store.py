@@ -0,0 +1,79 @@
+# bench_results_store.py
+"""
+Write and read time of scored candidates: candidates.csv-style CSV round-trips
+versus the Parquet ResultsStore (full read and a filtered, column-pruned read).
+
+    python benchmarks/bench_results_store.py --rows 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from resume_work.results_store import ResultsStore
+
+SUMMARIES = ["Outstanding Match", "Strong Match", "Moderate Match", "Needs Improvement", "Unsatisfactory"]
+
+
+def scored_rows(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    skills = ["Python", "Django", "AWS", "Docker", "SQL", "React", "Kubernetes"]
+    return [{
+        "Resume Name": f"resume_{i}.pdf",
+        "Content Hash": f"{i:064x}",
+        "Name": f"Candidate {i}",
+        "Email": f"candidate{i}@example.com",
+        "Phone": f"98{i:08d}",
+        "LinkedIn": "Unknown",
+        "GitHub": "Unknown",
+        "Overall Match Score": round(rng.uniform(20, 95), 2),
+        "Semantic Relevance": round(rng.uniform(0.2, 0.9), 3),
+        "Keywords Matched": ", ".join(rng.sample(skills, 3)),
+        "Summary": rng.choice(SUMMARIES),
+        "OCR Pages": "",
+        "Error": None,
+    } for i in range(rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384, help="Embedding size stored with the Parquet run")
+    args = parser.parse_args()
+
+    rows = scored_rows(args.rows)
+    rng = np.random.default_rng(0)
+    embeddings = {row["Content Hash"]: rng.standard_normal(args.dim).astype(np.float32) for row in rows}
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "candidates.csv")
+        write_s = _timed(lambda: pd.DataFrame(rows).to_csv(csv_path, index=False))
+        read_s = _timed(lambda: pd.read_csv(csv_path))
+        print(f"  CSV                      write {write_s:6.3f}s  read {read_s:6.3f}s  "
+              f"{os.path.getsize(csv_path) / 1e6:6.1f} MB")
+
+        store = ResultsStore(os.path.join(directory, "results"))
+        write_s = _timed(lambda: store.write_scores(rows, run_id="bench", embeddings=embeddings))
+        read_s = _timed(lambda: store.read_scores("bench"))
+        filtered_s = _timed(lambda: store.read_scores("bench", columns=["Name", "Email", "Overall Match Score"],
+                                                      min_score=80, include_errors=False))
+        size = sum(os.path.getsize(p) for p in store._run_paths("scores", "bench"))
+        print(f"  Parquet (+ embeddings)   write {write_s:6.3f}s  read {read_s:6.3f}s  "
+              f"{size / 1e6:6.1f} MB  (score >= 80, 3 columns: {filtered_s:.3f}s)")
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# bench_startup.py
+"""
+Cold-start and per-batch encoder latency for each analyzer backend.
+
+Every backend is measured in a fresh Python process, so import and model
+load times are true cold-start numbers (the model files themselves may
+already be in the local Hugging Face cache; run once beforehand to exclude
+downloads).
+
+    python benchmarks/bench_startup.py --backends torch torch-int8 onnx onnx-int8 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def measure(backend, batch_size, batches, model_name):
+    """Runs inside the child process; returns one result dict."""
+    started = time.perf_counter()
+    import model_handling
+    imported = time.perf_counter()
+    analyzer = model_handling.UniversalResumeAnalyzer(model_name=model_name, backend=backend)
+    loaded = time.perf_counter()
+    warm_up = analyzer.warm_up(batch_size=batch_size)
+
+    from bench_contact_extraction import synthetic_resume
+    import random
+    rng = random.Random(7)
+    texts = [analyzer.preprocess_text(synthetic_resume(rng)) for _ in range(batch_size)]
+    latencies = []
+    for _ in range(batches):
+        start = time.perf_counter()
+        analyzer.get_embeddings(texts, batch_size=batch_size)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "backend": backend,
+        "import_s": imported - started,
+        "model_load_s": loaded - imported,
+        "warm_up_s": warm_up,
+        "cold_start_s": loaded - started + warm_up,
+        "batch_size": batch_size,
+        "batch_median_s": statistics.median(latencies),
+        "batch_p95_s": sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)],
+        "resumes_per_s": batch_size / statistics.median(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx", "onnx-int8"])
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        print(json.dumps(measure(args.child, args.batch_size, args.batches, args.model)))
+        return
+
+    results = []
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", backend,
+             "--batch-size", str(args.batch_size), "--batches", str(args.batches), "--model", args.model],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            error = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+            print(f"  {backend:<11} failed: {error}")
+            results.append({"backend": backend, "error": error})
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"  {backend:<11} import {result['import_s']:5.2f}s  load {result['model_load_s']:5.2f}s  "
+              f"warm-up {result['warm_up_s']:5.2f}s  cold start {result['cold_start_s']:5.2f}s  "
+              f"batch[{args.batch_size}] {result['batch_median_s'] * 1000:7.1f} ms  "
+              f"({result['resumes_per_s']:.0f} resumes/s)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
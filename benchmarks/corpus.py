@@ -0,0 +1,132 @@
+# corpus.py
+"""
+Offline generator for synthetic resume corpora used by the benchmarks.
+
+    python benchmarks/corpus.py --out /tmp/resumes --docs 1000
+
+Produces a deterministic mix (for a given seed) of:
+  text     1-2 page text PDFs
+  multi    3-6 page text PDFs
+  long     10-20 page text PDFs
+  scanned  image-only PDFs (rendered pages, no text layer; need OCR)
+  docx     Word documents
+"""
+import argparse
+import io
+import os
+import random
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+from docx import Document
+
+from bench_contact_extraction import FILLER, synthetic_resume
+
+KINDS = (("text", 0.60), ("multi", 0.15), ("long", 0.10), ("docx", 0.10), ("scanned", 0.05))
+PAGES = {"text": (1, 2), "multi": (3, 6), "long": (10, 20), "scanned": (1, 2)}
+LINES_PER_PAGE = 45
+SECTIONS = ["Experience", "Projects", "Education", "Skills", "Certifications"]
+
+
+def _pick_kind(rng: random.Random) -> str:
+    roll, total = rng.random(), 0.0
+    for kind, share in KINDS:
+        total += share
+        if roll < total:
+            return kind
+    return KINDS[-1][0]
+
+
+def _resume_lines(rng: random.Random, pages: int) -> List[str]:
+    lines = synthetic_resume(rng).splitlines()[:6] + [""]
+    words = FILLER.split()
+    while len(lines) < pages * LINES_PER_PAGE:
+        if rng.random() < 0.08:
+            lines += ["", rng.choice(SECTIONS)]
+        start = rng.randrange(len(words))
+        lines.append(" ".join((words * 2)[start:start + rng.randint(8, 14)]))
+    return lines
+
+
+def _text_pdf(lines: List[str]) -> bytes:
+    doc = fitz.open()
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        page = doc.new_page()
+        page.insert_text((50, 60), "\n".join(lines[start:start + LINES_PER_PAGE]), fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _scanned_pdf(lines: List[str]) -> bytes:
+    # Render each text page to a bitmap and place only the image in the output
+    text_doc = fitz.open(stream=_text_pdf(lines), filetype="pdf")
+    doc = fitz.open()
+    for text_page in text_doc:
+        pix = text_page.get_pixmap(dpi=150, colorspace=fitz.csGRAY)
+        page = doc.new_page(width=text_page.rect.width, height=text_page.rect.height)
+        page.insert_image(page.rect, stream=pix.tobytes("png"))
+    data = doc.tobytes()
+    doc.close()
+    text_doc.close()
+    return data
+
+
+def _docx(lines: List[str]) -> bytes:
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def generate_document(rng: random.Random, kind: str) -> bytes:
+    lines = _resume_lines(rng, rng.randint(*PAGES.get(kind, (1, 2))))
+    if kind == "docx":
+        return _docx(lines)
+    if kind == "scanned":
+        return _scanned_pdf(lines)
+    return _text_pdf(lines)
+
+
+def generate_corpus(directory: str, docs: int, seed: int = 7) -> List[Dict]:
+    """
+    Write ``docs`` resumes into ``directory`` (reusing files already there from
+    the same seed) and return [{"path", "kind"}] in generation order.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(docs):
+        kind = _pick_kind(rng)
+        doc_rng = random.Random(f"{seed}-{i}")
+        path = os.path.join(directory, f"resume_{i:05d}_{kind}.{'docx' if kind == 'docx' else 'pdf'}")
+        if not os.path.exists(path):
+            data = generate_document(doc_rng, kind)
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+        corpus.append({"path": path, "kind": kind})
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.out, args.docs, args.seed)
+    counts = {}
+    for item in corpus:
+        counts[item["kind"]] = counts.get(item["kind"], 0) + 1
+    print(f"{len(corpus)} resumes in {args.out}: " + ", ".join(f"{n} {k}" for k, n in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
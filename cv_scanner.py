@@ -0,0 +1,262 @@
+# cv_scanner.py
+"""
+Headless batch scorer for resume folders of any size.
+
+    python -m cv_scanner score --jd jd.txt --input DIR --out results.parquet --workers 8
+
+Files are streamed through the analyzer's staged pipeline (read -> extract
+-> embed/score, ``--batch-files`` at a time). Each scored batch is appended to a checkpoint
+file next to the output (<out>.partial.jsonl), so an interrupted run picks
+up where it stopped when started again with the same job description.
+The final output (.parquet or .csv) is written once every file is scored.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from resume_work.ingest import SUPPORTED_FORMATS, file_format_for
+from resume_work.pipeline import batched
+
+logger = logging.getLogger("cv_scanner")
+
+CHECKPOINT_VERSION = 1
+
+
+def iter_resume_files(directory: str) -> Iterator[str]:
+    """Supported resume files under a directory, recursively, in a stable order."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in SUPPORTED_FORMATS:
+                yield os.path.join(root, name)
+
+
+def file_signature(path: str) -> str:
+    """Cheap change marker used to decide whether a checkpointed row is still valid."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class Checkpoint:
+    """
+    Append-only JSON-lines file of scored rows. The first line records the
+    job description hash and the scoring setup (model, encoder backend and
+    quantisation, chunk pooling); a checkpoint written for a different job
+    or setup is discarded rather than resumed.
+    """
+
+    def __init__(self, path: str, run_key: Dict[str, str]):
+        self.path = path
+        self.run_key = run_key
+        self.rows: Dict[str, Dict] = {}
+
+    def load(self) -> Dict[str, Dict]:
+        """Rows already scored in a previous, interrupted run, keyed by path."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+                if header != {"version": CHECKPOINT_VERSION, **self.run_key}:
+                    logger.info("⚠️ Checkpoint belongs to a different job or model; starting over")
+                    return {}
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        break  # torn last line from an interrupted write
+                    self.rows[row["path"]] = row
+        except FileNotFoundError:
+            pass
+        return self.rows
+
+    def start(self):
+        """Rewrite the checkpoint with the header and the rows kept from load()."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CHECKPOINT_VERSION, **self.run_key}) + "\n")
+            for row in self.rows.values():
+                f.write(json.dumps(row) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def append(self, rows: List[Dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        for row in rows:
+            self.rows[row["path"]] = row
+
+
+def _read_files(paths: Iterable[str]) -> Iterator[Tuple[bytes, Optional[str], str]]:
+    """(content, format, path) items for UniversalResumeAnalyzer.batch_analyze."""
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError as e:
+            logger.error(f"❌ Cannot read {path}: {e}")
+            content = b""
+        yield content, file_format_for(path), path
+
+
+def score_rows(analyzer, prepared_job, paths: List[str], args) -> Iterator[Dict]:
+    """Stream files through the analyzer's staged pipeline; one output row per path."""
+    results = analyzer.batch_analyze(
+        _read_files(paths), prepared_job, batch_size=args.batch_size,
+        workers=args.workers, timeout=args.timeout, chunk_files=args.batch_files
+    )
+    for result in results:
+        path = result["name"]
+        failed = result.get("Error")
+        yield {
+            "path": path,
+            "signature": file_signature(path) if os.path.exists(path) else None,
+            "Resume Name": os.path.basename(path),
+            "Content Hash": result["content_hash"],
+            **result["contacts"],
+            "Overall Match Score": result["overall_match_score"],
+            "Keywords Matched": ", ".join(result["keywords_matched"]),
+            "Semantic Relevance": result["semantic_relevance"],
+            "Summary": result["summary"],
+            "Error": failed or None,
+        }
+
+
+def write_results(rows: List[Dict], out_path: str):
+    """
+    Write the ranked table as Parquet or CSV, depending on the extension.
+    Files that could not be scored come last, without a rank.
+    """
+    df = pd.DataFrame(rows).drop(columns=["signature"], errors="ignore")
+    if not df.empty:
+        failed = df["Error"].notna() if "Error" in df.columns else pd.Series(False, index=df.index)
+        scored = df[~failed].sort_values("Overall Match Score", ascending=False, kind="stable")
+        df = pd.concat([scored, df[failed]], ignore_index=True)
+        ranks = pd.Series(pd.NA, index=df.index, dtype="Int64")
+        ranks[:len(scored)] = range(1, len(scored) + 1)
+        df.insert(0, "Rank", ranks)
+    tmp_path = out_path + ".tmp"
+    if out_path.lower().endswith(".parquet"):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, out_path)
+
+
+def score(args) -> int:
+    with open(args.jd, "r", encoding="utf-8") as f:
+        job_description = f.read()
+    if not job_description.strip():
+        print(f"❌ Job description file is empty: {args.jd}", file=sys.stderr)
+        return 2
+    if not os.path.isdir(args.input):
+        print(f"❌ Input directory not found: {args.input}", file=sys.stderr)
+        return 2
+
+    # Heavy imports are deferred so `--help` stays fast
+    from model_handling import ONNX_INT8_FILE, UniversalResumeAnalyzer, default_encoder_backend
+    from resume_work.embedding_cache import EmbeddingCache
+
+    chunk_pooling = None if args.chunk_pooling == "none" else args.chunk_pooling
+    try:
+        analyzer = UniversalResumeAnalyzer(
+            model_name=args.model,
+            cache=None if args.no_cache else EmbeddingCache(
+                model_name=args.model, backend=args.backend or default_encoder_backend()
+            ),
+            chunk_pooling=chunk_pooling,
+            backend=args.backend,
+        )
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    prepared_job = analyzer.prepare_job(job_description)
+
+    # Scores from different encoders/quantisations must never be mixed in one run
+    checkpoint = Checkpoint(args.out + ".partial.jsonl", {
+        "jd_sha256": hashlib.sha256(job_description.encode("utf-8")).hexdigest(),
+        "model": args.model,
+        "backend": analyzer.backend,
+        "onnx_file": os.environ.get("CV_SCANNER_ONNX_FILE", ONNX_INT8_FILE) if analyzer.backend == "onnx-int8" else "",
+        "chunk_pooling": chunk_pooling or "",
+    })
+    previous = checkpoint.load() if args.resume else {}
+
+    # Keep checkpointed rows only for files that still exist unchanged
+    kept, todo = {}, []
+    for path in iter_resume_files(args.input):
+        row = previous.get(path)
+        if row is not None and row.get("signature") == file_signature(path):
+            kept[path] = row
+        else:
+            todo.append(path)
+    checkpoint.rows = kept
+    checkpoint.start()
+    logger.info(f"✅ {len(kept) + len(todo)} resumes found, {len(kept)} already scored, {len(todo)} to score")
+
+    started = time.perf_counter()
+    done = 0
+    for rows in batched(score_rows(analyzer, prepared_job, todo, args), args.batch_files):
+        checkpoint.append(rows)
+        done += len(rows)
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        logger.info(f"✅ Scored {done}/{len(todo)} ({rate:.1f} files/s)")
+
+    write_results(list(checkpoint.rows.values()), args.out)
+    os.remove(checkpoint.path)
+    if args.metrics:
+        from resume_work.metrics import METRICS
+        METRICS.write(args.metrics)
+        for stage, stats in METRICS.summary().items():
+            logger.info(f"⏱️ {stage:<14} n={stats['count']:<7} total {stats['total_s']:8.2f}s  "
+                        f"mean {stats['mean_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms")
+    failed = sum(1 for row in checkpoint.rows.values() if row["Error"])
+    print(f"✅ Wrote {len(checkpoint.rows)} results to {args.out} ({failed} failed)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cv_scanner", description="Bitskraft CV Scanner command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score_cmd = commands.add_parser("score", help="Score a folder of resumes against a job description")
+    score_cmd.add_argument("--jd", required=True, help="Text file with the job description")
+    score_cmd.add_argument("--input", required=True, help="Folder of PDF/DOCX resumes (searched recursively)")
+    score_cmd.add_argument("--out", required=True, help="Output file (.parquet or .csv)")
+    score_cmd.add_argument("--workers", type=int, default=None, help="Extraction processes (default: CPU count)")
+    score_cmd.add_argument("--timeout", type=float, default=None, help="Per-file extraction timeout in seconds")
+    score_cmd.add_argument("--batch-files", type=int, default=256, help="Files per extract/score/checkpoint batch")
+    score_cmd.add_argument("--batch-size", type=int, default=32, help="Embedding mini-batch size")
+    score_cmd.add_argument("--model", default="all-MiniLM-L6-v2", help="SentenceTransformer model name")
+    score_cmd.add_argument("--chunk-pooling", choices=("none", "max", "mean", "topk"), default="none",
+                           help="Score long resumes over token windows pooled this way "
+                                "(default: none, whole-document scoring)")
+    score_cmd.add_argument("--backend", default=None,
+                           help="Encoder backend: torch, torch-int8, onnx or onnx-int8 "
+                                "(default: CV_SCANNER_ENCODER_BACKEND or torch)")
+    score_cmd.add_argument("--no-resume", dest="resume", action="store_false",
+                           help="Ignore an existing checkpoint and rescore everything")
+    score_cmd.add_argument("--no-cache", action="store_true", help="Do not use the on-disk text/embedding cache")
+    score_cmd.add_argument("--metrics", help="Write per-stage timings (Prometheus text format) to this file")
+    score_cmd.set_defaults(func=score)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    args = build_parser().parse_args(argv)
+    if getattr(args, "batch_files", 1) < 1:
+        print("❌ --batch-files must be at least 1", file=sys.stderr)
+        return 2
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,135 +1,294 @@
 # model_handling.py
-import io
-import fitz  # PyMuPDF
-from docx import Document
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+import os
 import re
-import pytesseract
-from pdf2image import convert_from_bytes
-from typing import List, Dict, Tuple
+import time
+from typing import List, Dict, Tuple, Union, Optional, Iterable, Iterator
 import logging
 
+from resume_work import text_extraction
+from resume_work.contact_extraction import extract_contacts
+from resume_work.embedding_cache import EmbeddingCache, content_hash
+from resume_work.ingest import ingest_files
+from resume_work.keyword_matcher import KeywordMatcher
+from resume_work.metrics import METRICS
+from resume_work.pipeline import batched, run_stages
+from resume_work.skills_taxonomy import SkillsTaxonomy, load_default_taxonomy
+from resume_work.text_extraction import ExtractionPool
+from resume_work.vector_index import ResumeVectorIndex
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Optional: Set Tesseract path if not in PATH
-# pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# "torch" is the stock SentenceTransformer model. The others trade a little
+# accuracy for CPU speed: dynamic int8 quantisation of the Linear layers, or
+# ONNX Runtime with the fp32 or int8-quantised export of the model.
+ENCODER_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+ONNX_INT8_FILE = "onnx/model_qint8_avx2.onnx"
+
+# Characters preprocess_text drops (whitespace is collapsed separately)
+_PUNCTUATION = re.compile(r'[^\w\s\-]+')
+
+# Final score thresholds (exclusive lower bounds) and their summary labels
+SUMMARY_THRESHOLDS = (80, 65, 50, 35)
+SUMMARY_LABELS = ("Outstanding Match", "Strong Match", "Moderate Match", "Needs Improvement", "Unsatisfactory")
+
+
+def default_encoder_backend() -> str:
+    """Backend used when none is given: CV_SCANNER_ENCODER_BACKEND, else "torch"."""
+    return os.environ.get("CV_SCANNER_ENCODER_BACKEND", "torch")
+
+
+def load_encoder(model_name: str, backend: str = "torch"):
+    """
+    Load a SentenceTransformer for the given backend. sentence_transformers
+    (and with it torch/transformers) is only imported here, so importing this
+    module stays cheap until a model is actually needed.
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"backend must be one of {ENCODER_BACKENDS}")
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend == "torch-int8":
+        import torch
+        model = SentenceTransformer(model_name, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        return SentenceTransformer(model_name, device="cpu", backend="onnx")
+    return SentenceTransformer(
+        model_name, device="cpu", backend="onnx",
+        model_kwargs={"file_name": os.environ.get("CV_SCANNER_ONNX_FILE", ONNX_INT8_FILE)}
+    )
+
+
+class PreparedJob:
+    """
+    Job-side scoring inputs, built once per evaluation run by
+    UniversalResumeAnalyzer.prepare_job and reused for every resume.
+    """
+
+    def __init__(self, description: str, clean_text: str,
+                 embedding: Union[np.ndarray, None], keywords: List[str],
+                 aliases: Optional[Dict[str, str]] = None):
+        self.description = description
+        self.clean_text = clean_text
+        self.embedding = embedding
+        self.matcher = KeywordMatcher(keywords, aliases=aliases)
+        self.keywords = self.matcher.keywords
+
+    def match_keywords(self, resume_text: str) -> Dict[str, int]:
+        """
+        Return {keyword: occurrences} for the job keywords found in a resume.
+        Matches whole terms only, so "Java" does not match "JavaScript";
+        taxonomy aliases count towards their canonical skill.
+        """
+        return self.matcher.count(resume_text)
+
+
+class BatchScores:
+    """
+    Columnar scores for N resumes against one job, as returned by
+    UniversalResumeAnalyzer.score_batch. Row i of every array is resume i.
+
+    similarity           (n,) float32 cosine similarity to the job embedding
+    embeddings           (n, dim) float32 L2-normalised resume embeddings; with
+                         chunk pooling, the mean of all chunk vectors (not job specific)
+    keyword_counts       (n, k) int32 occurrences of each job keyword
+    semantic_relevance   (n,) similarity scaled to 0-100, one decimal
+    keyword_score        (n,) percentage of job keywords matched
+    overall_match_score  (n,) 60/40 weighted score capped at 100, one decimal
+    summary              (n,) qualitative label of the overall score
+    """
+
+    def __init__(self, keywords: List[str], similarity: np.ndarray, keyword_counts: np.ndarray,
+                 embeddings: Optional[np.ndarray] = None, timings: Optional[List[Dict[str, float]]] = None):
+        self.keywords = list(keywords)
+        self.similarity = np.asarray(similarity, dtype=np.float32)
+        self.keyword_counts = keyword_counts
+        self.embeddings = embeddings
+        self.timings = timings
+
+        semantic_score = self.similarity.astype(np.float64) * 100
+        if self.keywords:
+            self.keyword_score = (keyword_counts > 0).sum(axis=1) / len(self.keywords) * 100
+        else:
+            self.keyword_score = np.zeros(len(self.similarity))
+        self.semantic_relevance = np.round(semantic_score, 1)
+        self.overall_match_score = np.round(np.minimum(0.60 * semantic_score + 0.40 * self.keyword_score, 100), 1)
+        self.summary = np.select(
+            [self.overall_match_score > threshold for threshold in SUMMARY_THRESHOLDS],
+            SUMMARY_LABELS[:-1], default=SUMMARY_LABELS[-1]
+        ).astype(object)
+
+    def __len__(self) -> int:
+        return len(self.similarity)
+
+    def keywords_matched(self, i: int) -> List[str]:
+        return [self.keywords[j] for j in np.flatnonzero(self.keyword_counts[i])]
+
+    def to_dicts(self) -> List[Dict]:
+        """Per-resume result dicts in the analyze_resume format."""
+        results = []
+        for i in range(len(self)):
+            columns = np.flatnonzero(self.keyword_counts[i])
+            result = {
+                "overall_match_score": float(self.overall_match_score[i]),
+                "keywords_matched": [self.keywords[j] for j in columns],
+                "keyword_counts": {self.keywords[j]: int(self.keyword_counts[i, j]) for j in columns},
+                "keywords_total": self.keywords,
+                "semantic_relevance": float(self.semantic_relevance[i]),
+                "summary": self.summary[i],
+            }
+            if self.timings is not None:
+                result["timings"] = self.timings[i]
+            results.append(result)
+        return results
+
+    def to_frame(self, index=None):
+        """
+        One DataFrame row per resume with the scalar score columns and the
+        matched keywords as a comma-separated string.
+        """
+        import pandas as pd
+        return pd.DataFrame({
+            "overall_match_score": self.overall_match_score,
+            "semantic_relevance": self.semantic_relevance,
+            "keyword_score": self.keyword_score,
+            "similarity": self.similarity,
+            "keywords_matched": [", ".join(self.keywords_matched(i)) for i in range(len(self))],
+            "summary": self.summary,
+        }, index=index)
+
 
 class UniversalResumeAnalyzer:
 
-    def __init__(self):
+    CHUNK_POOLING_MODES = ("max", "mean", "topk")
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', cache: Optional[EmbeddingCache] = None,
+                 chunk_pooling: Optional[str] = None, chunk_top_k: int = 3,
+                 chunk_overlap: int = 32, max_chunks: int = 16,
+                 taxonomy: Optional[SkillsTaxonomy] = None, backend: Optional[str] = None):
         """
         Initialize the analyzer with a lightweight sentence transformer model.
+        :param cache: Optional on-disk cache of extracted text and embeddings;
+            it must be created for the same model_name and backend
+        :param backend: Encoder backend, one of ENCODER_BACKENDS; defaults to
+            CV_SCANNER_ENCODER_BACKEND or "torch"
+        :param taxonomy: Skills taxonomy used for keyword extraction and
+            alias matching; defaults to the bundled skills_taxonomy.json
+        :param chunk_pooling: None scores only what fits in the model window;
+            "max", "mean" or "topk" split long resumes into token windows and
+            pool the per-chunk similarities
+        :param chunk_top_k: Number of best chunks averaged by "topk" pooling
+        :param chunk_overlap: Tokens shared by consecutive chunks
+        :param max_chunks: Upper bound on chunks encoded per resume
         """
+        if chunk_pooling is not None and chunk_pooling not in self.CHUNK_POOLING_MODES:
+            raise ValueError(f"chunk_pooling must be one of {self.CHUNK_POOLING_MODES} or None")
+        self.backend = backend or default_encoder_backend()
+        if cache is not None and (cache.model_name, cache.backend) != (model_name, self.backend):
+            raise ValueError(f"Embedding cache is for {cache.model_name} ({cache.backend}), "
+                             f"not {model_name} ({self.backend})")
+        self.model_name = model_name
+        self.cache = cache
+        self.chunk_pooling = chunk_pooling
+        self.chunk_top_k = chunk_top_k
+        self.chunk_overlap = chunk_overlap
+        self.max_chunks = max_chunks
+        self.taxonomy = taxonomy if taxonomy is not None else load_default_taxonomy()
         try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("✅ SentenceTransformer model loaded.")
+            start = time.perf_counter()
+            self.model = load_encoder(model_name, self.backend)
+            logger.info(f"✅ SentenceTransformer model loaded ({self.backend}, {time.perf_counter() - start:.1f}s).")
         except Exception as e:
             logger.error(f"❌ Failed to load model: {e}")
             raise
 
+    def warm_up(self, batch_size: int = 32) -> float:
+        """
+        Run one full-size encoder batch so lazy initialisation (kernel
+        selection, ONNX session setup, tokenizer caches) happens now rather
+        than on the first real request.
+        :return: Warm-up time in seconds
+        """
+        start = time.perf_counter()
+        sample = "Experienced software engineer with Python, SQL and cloud experience. " * 24
+        self.get_embeddings([sample] * batch_size, batch_size=batch_size)
+        self.prepare_job(sample)
+        elapsed = time.perf_counter() - start
+        logger.info(f"✅ Encoder warmed up in {elapsed:.2f}s")
+        return elapsed
+
     def extract_text_from_pdf(self, content: bytes) -> str:
         """
         Extract text from PDF using PyMuPDF.
         Falls back to OCR if no text found.
         """
-        try:
-            pdf_stream = io.BytesIO(content)
-            doc = fitz.open(stream=pdf_stream, filetype="pdf")
-            text = ""
-            for page in doc:
-                page_text = page.get_text("text")
-                if page_text.strip():
-                    text += page_text + "\n"
-            doc.close()
-
-            if text.strip():
-                logger.info(f"✅ Extracted {len(text)} characters from PDF (text-based)")
-                return text
-            else:
-                logger.info("📄 No extractable text in PDF. Trying OCR...")
-                return self.extract_text_with_ocr(content)
-        except Exception as e:
-            logger.warning(f"PDF text extraction failed: {e}")
-            return ""
+        return text_extraction.extract_text_from_pdf(content)
 
     def extract_text_from_docx(self, content: bytes) -> str:
         """
         Extract text from .docx file.
         """
-        try:
-            doc = Document(io.BytesIO(content))
-            paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
-            text = "\n".join(paragraphs)
-            logger.info(f"✅ Extracted {len(text)} characters from DOCX")
-            return text
-        except Exception as e:
-            logger.warning(f"DOCX extraction failed: {e}")
-            return ""
+        return text_extraction.extract_text_from_docx(content)
 
     def extract_text_with_ocr(self, content: bytes) -> str:
         """
         Use OCR to extract text from scanned PDFs.
-        Converts PDF pages to images and runs Tesseract OCR.
         """
-        try:
-            # Convert PDF to list of PIL images
-            images = convert_from_bytes(content, dpi=200)  # High DPI for clarity
-            text = ""
-            for i, img in enumerate(images):
-                # Preprocess: Convert to grayscale for better OCR
-                img = img.convert("L")
-                # Optional: Apply threshold to make text clearer
-                # img = img.point(lambda x: 0 if x < 140 else 255, mode='1')
-
-                page_text = pytesseract.image_to_string(img, lang='eng')
-                if page_text.strip():
-                    text += f"Page {i+1}:\n{page_text}\n\n"
-                else:
-                    logger.info(f"❌ OCR found no text on page {i+1}")
-            text = text.strip()
-            if text:
-                logger.info(f"✅ OCR succeeded: extracted {len(text)} characters")
-            else:
-                logger.warning("❌ OCR returned no text")
-            return text
-        except Exception as e:
-            logger.error(f"OCR failed: {e}")
-            return ""
-
-    def extract_text(self, content: bytes, file_format: str) -> str:
+        return text_extraction.extract_text_with_ocr(content)
 
-        if not content or len(content) == 0:
-            logger.warning("Empty file content.")
-            return ""
+    def extract_text(self, content: bytes, file_format: str, content_key: Optional[str] = None) -> str:
+        """
+        Extract text from a PDF or DOCX file.
+        With a cache configured, text is looked up by content hash first so
+        repeated runs skip PDF parsing and OCR entirely.
+        """
+        if self.cache is None or not content:
+            return text_extraction.extract_text(content, file_format)
 
+        key = content_key or content_hash(content)
+        cached = self.cache.get_text(key)
+        if cached is not None:
+            return cached
         try:
-            if file_format == "pdf":
-                return self.extract_text_from_pdf(content)
-            elif file_format == "docx":
-                return self.extract_text_from_docx(content)
-            else:
-                logger.warning(f"Unsupported format: {file_format}")
-                return ""
+            document = text_extraction.extract_document(content, file_format)
         except Exception as e:
             logger.error(f"Error in extract_text: {e}")
             return ""
+        if not document["ocr_errors"]:
+            self.cache.put_text(key, document["text"], document["ocr_pages"])
+        return document["text"]
+
+    def extract_contacts(self, text: str) -> Dict[str, str]:
+        """
+        Name, email, phone, LinkedIn and GitHub from resume text (same fields
+        as the CV Parser's candidate records).
+        """
+        return extract_contacts(text)
 
     def preprocess_text(self, text: str) -> str:
         """
         Clean and normalize text.
         """
-        text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-        text = re.sub(r'[^\w\s\-]', '', text)  # Remove punctuation
+        text = " ".join(text.split())  # Normalize whitespace
+        text = _PUNCTUATION.sub('', text)  # Remove punctuation
         return text.lower().strip()
 
     def extract_keywords(self, job_desc: str, top_n: int = 30) -> List[str]:
         """
         Extract potential keywords from job description.
+        Uses the skills taxonomy (most-mentioned skills first) and falls back
+        to proper nouns and common tech terms when no known skill is found.
         """
+        if self.taxonomy is not None:
+            counts = self.taxonomy.find(job_desc)
+            if counts:
+                return sorted(counts, key=lambda skill: -counts[skill])[:top_n]
+
         # Extract proper nouns (capitalized words)
         proper_nouns = re.findall(r'\b[A-Z][a-z]{2,}\b', job_desc)
 
@@ -155,85 +314,413 @@ class UniversalResumeAnalyzer:
             return self.model.encode("")
         return self.model.encode(text)
 
+    def get_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Encode many texts with a single batched model call.
+        Returns an (n, dim) float32 matrix of L2-normalised embeddings,
+        so cosine similarity reduces to a dot product.
+        """
+        if not texts:
+            dim = self.model.get_sentence_embedding_dimension()
+            return np.zeros((0, dim), dtype=np.float32)
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return embeddings.astype(np.float32, copy=False)
+
     def compute_similarity(self, text1: str, text2: str) -> float:
         """
         Compute cosine similarity between two texts.
         """
         if not text1.strip() or not text2.strip():
             return 0.0
-        emb1 = self.get_embedding(text1)
-        emb2 = self.get_embedding(text2)
-        return cosine_similarity([emb1], [emb2])[0][0]
+        emb1, emb2 = self.get_embeddings([text1, text2])
+        return float(np.dot(emb1, emb2))
 
-    def analyze_resume(self, resume_text: str, job_description: str) -> Dict:
+    def prepare_job(self, job_description: str) -> PreparedJob:
         """
-        Analyze a single resume against the job description.
+        Clean, embed and extract keywords from the job description once.
+        Pass the result to analyze_resume / analyze_resumes / batch_analyze
+        so a batch run pays the job-side cost a single time.
         """
-        clean_resume = self.preprocess_text(resume_text)
         clean_job = self.preprocess_text(job_description)
+        embedding = self.get_embeddings([clean_job])[0] if clean_job.strip() else None
+        keywords = self.extract_keywords(job_description, top_n=30)
+        aliases = self.taxonomy.aliases_for(keywords) if self.taxonomy is not None else None
+        return PreparedJob(job_description, clean_job, embedding, keywords, aliases=aliases)
+
+    def _as_prepared(self, job: Union[str, PreparedJob]) -> PreparedJob:
+        return job if isinstance(job, PreparedJob) else self.prepare_job(job)
+
+    def analyze_resume(self, resume_text: str, job_description: Union[str, PreparedJob]) -> Dict:
+        """
+        Analyze a single resume against the job description
+        (raw text or a PreparedJob from prepare_job).
+        """
+        return self.analyze_resumes([resume_text], job_description)[0]
+
+    def analyze_resumes(self, resume_texts: List[str], job_description: Union[str, PreparedJob],
+                        batch_size: int = 32, content_keys: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Analyze many resumes against the job description in one pass.
+        Same scoring as score_batch, returned as one result dict per resume.
+        :param content_keys: Optional content hashes aligned with resume_texts,
+            used to reuse cached embeddings
+        """
+        return self.score_batch(resume_texts, job_description, batch_size, content_keys).to_dicts()
+
+    def score_batch(self, resume_texts: List[str], job_description: Union[str, PreparedJob],
+                    batch_size: int = 32, content_keys: Optional[List[str]] = None) -> BatchScores:
+        """
+        Score N resumes against the job description in one vectorised pass.
+        All resumes are encoded in mini-batches with a single model call,
+        scored against the job vector with one matrix product, and the
+        weighted scores and summary labels are computed on whole columns.
+        :param content_keys: Optional content hashes aligned with resume_texts,
+            used to reuse cached embeddings
+        :return: BatchScores with one row per resume; call to_frame() for a DataFrame
+        """
+        job = self._as_prepared(job_description)
+        timings: List[Dict[str, float]] = [{} for _ in resume_texts]
+        clean_resumes = []
+        for text, doc_timings in zip(resume_texts, timings):
+            start = time.perf_counter()
+            clean_resumes.append(self.preprocess_text(text))
+            doc_timings["preprocess"] = time.perf_counter() - start
+        non_empty = [i for i, text in enumerate(clean_resumes) if text.strip()]
 
         # 1. Semantic Relevance (60% weight)
-        semantic_sim = self.compute_similarity(clean_resume, clean_job)
-        semantic_score = semantic_sim * 100  # Scale to 0–100
+        similarities = np.zeros(len(clean_resumes), dtype=np.float32)
+        embeddings = None
+        if job.embedding is not None and non_empty:
+            keys = [content_keys[i] for i in non_empty] if content_keys else None
+            similarities[non_empty], resume_embeddings, encode_s, similarity_s = self._resume_similarities(
+                [clean_resumes[i] for i in non_empty], keys, job.embedding, batch_size
+            )
+            if resume_embeddings is not None:
+                embeddings = np.zeros((len(clean_resumes), resume_embeddings.shape[1]), dtype=np.float32)
+                embeddings[non_empty] = resume_embeddings
+            # Encoding is batched, so each resume is charged an equal share
+            for i in non_empty:
+                timings[i]["encode"] = encode_s / len(non_empty)
+                timings[i]["similarity"] = similarity_s / len(non_empty)
 
         # 2. Keyword Matching (40% weight)
-        keywords = self.extract_keywords(job_description, top_n=30)
-        matched = [kw for kw in keywords if kw.lower() in clean_resume]
-        keyword_score = (len(matched) / len(keywords)) * 100 if keywords else 0
+        column = {keyword: j for j, keyword in enumerate(job.keywords)}
+        keyword_counts = np.zeros((len(resume_texts), len(job.keywords)), dtype=np.int32)
+        for i, (resume_text, doc_timings) in enumerate(zip(resume_texts, timings)):
+            start = time.perf_counter()
+            for keyword, count in job.match_keywords(resume_text).items():
+                keyword_counts[i, column[keyword]] = count
+            doc_timings["keyword_match"] = time.perf_counter() - start
+            METRICS.observe_timings(doc_timings)
 
-        # Final weighted score
-        final_score = 0.60 * semantic_score + 0.40 * keyword_score
-        final_score = round(min(final_score, 100), 1)
+        return BatchScores(job.keywords, similarities, keyword_counts, embeddings=embeddings, timings=timings)
 
-        return {
-            "overall_match_score": final_score,
-            "keywords_matched": matched,
-            "keywords_total": keywords,
-            "semantic_relevance": round(semantic_score, 1),
-            "summary": (
-                "Outstanding Match" if final_score > 80 else
-                "Strong Match" if final_score > 65 else
-                "Moderate Match" if final_score > 50 else
-                "Needs Improvement" if final_score > 35 else
-                "Unsatisfactory"
-            )
-        }
+    def _resume_similarities(self, clean_texts: List[str], keys: Optional[List[str]], job_embedding: np.ndarray,
+                             batch_size: int) -> Tuple[np.ndarray, Optional[np.ndarray], float, float]:
+        """
+        Cosine similarity of each preprocessed resume to the job embedding,
+        pooled over chunks when chunk_pooling is enabled.
+        :return: (similarities, resume embeddings, encode seconds, similarity
+            seconds); with chunk pooling each embedding is the normalised mean
+            of all the resume's chunks, so it does not depend on the job
+        """
+        start = time.perf_counter()
+        if self.chunk_pooling is None:
+            embeddings = self._embed_resumes(clean_texts, keys, batch_size)
+            encoded = time.perf_counter()
+            return embeddings @ job_embedding, embeddings, encoded - start, time.perf_counter() - encoded
 
-    def batch_analyze(self, files: List[Tuple[bytes, str]], job_description: str) -> List[Dict]:
+        chunk_sets = self._embed_resume_chunks(clean_texts, keys, batch_size)
+        encoded = time.perf_counter()
+        chunk_sims = np.vstack(chunk_sets) @ job_embedding
+        bounds = np.cumsum([len(chunks) for chunks in chunk_sets])[:-1]
+        per_resume = np.split(chunk_sims, bounds)
+        similarities = np.array([self._pool_chunks(sims) for sims in per_resume], dtype=np.float32)
+        embeddings = np.vstack([self._mean_chunk_vector(chunks) for chunks in chunk_sets])
+        return similarities, embeddings, encoded - start, time.perf_counter() - encoded
+
+    def _pool_chunks(self, sims: np.ndarray) -> float:
+        if self.chunk_pooling == "max":
+            return float(sims.max())
+        if self.chunk_pooling == "mean":
+            return float(sims.mean())
+        k = min(self.chunk_top_k, len(sims))
+        return float(np.partition(sims, len(sims) - k)[-k:].mean())
+
+    @staticmethod
+    def _mean_chunk_vector(chunks: np.ndarray) -> np.ndarray:
         """
-        Analyze multiple resumes in batch.
-        :param files: List of (content, format) tuples, format in ['pdf', 'docx']
-        :param job_description: Job description text
-        :return: List of analysis results
+        L2-normalised mean of all chunk vectors of one resume. Used as the
+        resume's vector index entry, which later jobs search with, so unlike
+        the "max"/"topk" scores it must not be picked with the current job.
         """
-        results = []
-        for i, (content, file_format) in enumerate(files):
-            try:
-                text = self.extract_text(content, file_format)
-                if not text.strip():
-                    result = {
-                        "Error": "No text extracted",
-                        "overall_match_score": 0.0,
-                        "keywords_matched": [],
-                        "semantic_relevance": 0.0,
-                        "summary": "No content detected"
-                    }
-                else:
-                    analysis = self.analyze_resume(text, job_description)
-                    result = {
-                        "overall_match_score": analysis["overall_match_score"],
-                        "keywords_matched": analysis["keywords_matched"],
-                        "semantic_relevance": analysis["semantic_relevance"],
-                        "summary": analysis["summary"]
-                    }
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Failed to process file {i}: {e}")
-                results.append({
-                    "Error": str(e),
+        vector = chunks.mean(axis=0)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm > 0 else vector).astype(np.float32)
+
+    def chunk_text(self, text: str) -> List[str]:
+        """
+        Split text into windows that fit the model's token limit.
+        Uses tokenizer offsets so chunks are slices of the original text.
+        """
+        window = self.model.max_seq_length - 2  # room for [CLS]/[SEP]
+        encoding = self.model.tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True,
+            truncation=False, verbose=False
+        )
+        offsets = encoding["offset_mapping"]
+        if len(offsets) <= window:
+            return [text]
+
+        stride = max(1, window - self.chunk_overlap)
+        chunks = []
+        for start in range(0, len(offsets), stride):
+            end = min(start + window, len(offsets))
+            chunks.append(text[offsets[start][0]:offsets[end - 1][1]])
+            if end == len(offsets) or len(chunks) == self.max_chunks:
+                break
+        return chunks
+
+    def _embed_resume_chunks(self, clean_texts: List[str], keys: Optional[List[str]],
+                             batch_size: int) -> List[np.ndarray]:
+        """
+        Chunk embeddings per resume, all chunks of all uncached resumes being
+        encoded in one batched call. Returns one (n_chunks, dim) matrix per resume.
+        """
+        dim = self.model.get_sentence_embedding_dimension()
+        use_cache = self.cache is not None and keys
+        # Chunk matrices are cached under their own key so they never mix
+        # with whole-document embeddings.
+        chunk_keys = [f"{key}:chunks-{self.model.max_seq_length}-{self.chunk_overlap}-{self.max_chunks}"
+                      for key in keys] if use_cache else None
+
+        cached = self.cache.get_embeddings(chunk_keys) if use_cache else {}
+        chunk_sets: List[Optional[np.ndarray]] = [
+            cached[chunk_keys[i]].reshape(-1, dim) if use_cache and chunk_keys[i] in cached else None
+            for i in range(len(clean_texts))
+        ]
+        missing = [i for i, chunks in enumerate(chunk_sets) if chunks is None]
+        if missing:
+            flat, owners = [], []
+            for i in missing:
+                for chunk in self.chunk_text(clean_texts[i]):
+                    flat.append(chunk)
+                    owners.append(i)
+            embeddings = self.get_embeddings(flat, batch_size=batch_size)
+            owners = np.array(owners)
+            for i in missing:
+                chunk_sets[i] = embeddings[owners == i]
+            if use_cache:
+                self.cache.put_embeddings({chunk_keys[i]: chunk_sets[i].ravel() for i in missing})
+            logger.info(f"✅ Encoded {len(flat)} chunks for {len(missing)} resumes")
+        return chunk_sets
+
+    def _embed_resumes(self, clean_texts: List[str], keys: Optional[List[str]], batch_size: int) -> np.ndarray:
+        """
+        Embed preprocessed resumes, serving cache hits and encoding only the misses.
+        """
+        if self.cache is None or not keys:
+            return self.get_embeddings(clean_texts, batch_size=batch_size)
+
+        cached = self.cache.get_embeddings(keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            fresh = self.get_embeddings([clean_texts[i] for i in missing], batch_size=batch_size)
+            new_entries = {keys[i]: emb for i, emb in zip(missing, fresh)}
+            self.cache.put_embeddings(new_entries)
+            cached.update(new_entries)
+        logger.info(f"✅ Embeddings: {len(keys) - len(missing)} cached, {len(missing)} encoded")
+        return np.vstack([cached[key] for key in keys])
+
+    def add_to_index(self, index: ResumeVectorIndex, resume_texts: List[str], content_keys: List[str],
+                     names: Optional[List[str]] = None, batch_size: int = 32,
+                     embeddings: Optional[np.ndarray] = None):
+        """
+        Store embeddings of resumes in a vector index so later job
+        descriptions can retrieve candidates without re-reading files.
+        Resumes already in the index are skipped.
+        :param embeddings: Optional vectors aligned with resume_texts, e.g.
+            BatchScores.embeddings from scoring them; without them the resumes
+            are encoded as whole documents
+        """
+        known = index.contains(content_keys)
+        todo = [i for i, key in enumerate(content_keys) if key not in known and resume_texts[i].strip()]
+        if not todo:
+            return
+        keys = [content_keys[i] for i in todo]
+        if embeddings is not None:
+            vectors = np.asarray(embeddings)[todo]
+        else:
+            clean = [self.preprocess_text(resume_texts[i]) for i in todo]
+            vectors = self._embed_resumes(clean, keys, batch_size)
+        index.add(keys, vectors, [names[i] for i in todo] if names else None)
+        logger.info(f"✅ Indexed {len(todo)} resumes ({len(index)} total)")
+
+    def top_candidates(self, index: ResumeVectorIndex, job_description: Union[str, PreparedJob],
+                       top_k: int = 20, rerank: bool = True) -> List[Dict]:
+        """
+        Retrieve the top-K indexed resumes for a job by embedding similarity.
+        With a text cache the shortlist gets the full result format: rerank=True
+        rescores it with the full semantic + keyword analysis, rerank=False
+        keeps the index similarity and adds keyword matches from the cached
+        text. Without a cache only the similarity is known, so the hits carry
+        "semantic_relevance" but no overall score or summary.
+        :return: Result dicts (best first) with "content_hash" and "name" added
+        """
+        job = self._as_prepared(job_description)
+        if job.embedding is None:
+            return []
+        hits = index.search(job.embedding, top_k=top_k)
+        if self.cache is None:
+            return [{**hit, "semantic_relevance": round(hit["similarity"] * 100, 1)} for hit in hits]
+
+        texts = [self.cache.get_text(hit["content_hash"]) or "" for hit in hits]
+        if not rerank:
+            column = {keyword: j for j, keyword in enumerate(job.keywords)}
+            keyword_counts = np.zeros((len(hits), len(job.keywords)), dtype=np.int32)
+            for i, text in enumerate(texts):
+                for keyword, count in job.match_keywords(text).items():
+                    keyword_counts[i, column[keyword]] = count
+            scores = BatchScores(job.keywords, [hit["similarity"] for hit in hits], keyword_counts)
+            results = [{**hit, **result} for hit, result in zip(hits, scores.to_dicts())]
+            return sorted(results, key=lambda r: -r["overall_match_score"])
+
+        analyses = self.analyze_resumes(texts, job, content_keys=[hit["content_hash"] for hit in hits])
+        results = [{**hit, **analysis} for hit, analysis in zip(hits, analyses)]
+        return sorted(results, key=lambda r: -r["overall_match_score"])
+
+    def batch_analyze(self, files: Iterable[Tuple], job_description: Union[str, PreparedJob],
+                      batch_size: int = 32, workers: Optional[int] = None,
+                      timeout: Optional[float] = None, chunk_files: int = 64,
+                      queue_size: int = 2, index: Optional[ResumeVectorIndex] = None) -> Iterator[Dict]:
+        """
+        Analyze resumes from any iterable, yielding one result per file in input order.
+        Files flow through bounded-queue stages (read -> extract -> embed/score),
+        ``chunk_files`` at a time, so peak memory follows the chunk size rather
+        than the total upload size and results arrive while later files are
+        still being extracted.
+        :param files: Iterable of (content, format) or (content, format, name)
+            tuples, format in ['pdf', 'docx']; it is consumed lazily
+        :param job_description: Job description text or a PreparedJob
+        :param batch_size: Number of resumes per encoder mini-batch
+        :param workers: Number of extraction processes (defaults to CPU count)
+        :param timeout: Per-file extraction timeout in seconds
+        :param chunk_files: Files extracted and scored together per stage step
+        :param queue_size: Chunks buffered between stages
+        :param index: Optional vector index every scored resume is added to
+        :return: Generator of analysis results, each with "name",
+            "content_hash", "contacts", "ocr_pages", "ocr_errors" and per-stage "timings"
+        """
+        job = self._as_prepared(job_description)
+
+        def read():
+            # Time spent producing each item is the "read" stage
+            iterator = iter(files)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                read_s = time.perf_counter() - start
+                METRICS.observe("read", read_s)
+                yield item, read_s
+
+        def extract(chunk):
+            # Same ingest stage as the CV Parser: text, OCR pages and contacts
+            # come from one pass in the workers. Raw bytes are dropped here;
+            # later stages only see the records.
+            records = ingest_files([(item[2] if len(item) > 2 else None, item[0]) for item, _ in chunk],
+                                   cache=self.cache, timeout=timeout, pool=pool,
+                                   formats=[item[1] for item, _ in chunk])
+            for (_, read_s), record in zip(chunk, records):
+                record["timings"] = {"read": read_s, **record["timings"]}
+            return records
+
+        def score(chunk):
+            return self._score_extracted(chunk, job, batch_size, index)
+
+        # One spawn-context pool for the whole run, not one per chunk
+        pool = ExtractionPool(workers)
+        try:
+            for results in run_stages(batched(read(), chunk_files), [extract, score], queue_size=queue_size):
+                yield from results
+        finally:
+            pool.close()
+
+    def _score_extracted(self, records: List[Dict], job: PreparedJob, batch_size: int,
+                         index: Optional[ResumeVectorIndex]) -> List[Dict]:
+        """
+        Score one chunk of ingest records (see resume_work.ingest.ingest_files).
+        """
+        results: List[Dict] = [None] * len(records)
+        positions = []
+        for i, record in enumerate(records):
+            if record["error"] is not None:
+                logger.error(f"Failed to process {record['name'] or f'file {i}'}: {record['error']}")
+                results[i] = self._failed_result(record["error"])
+            elif not record["text"].strip():
+                results[i] = {
+                    "Error": "No text extracted",
                     "overall_match_score": 0.0,
                     "keywords_matched": [],
                     "semantic_relevance": 0.0,
-                    "summary": "Processing failed"
-                })
-        return results
\ No newline at end of file
+                    "summary": "No content detected"
+                }
+            else:
+                positions.append(i)
+
+        texts = [records[i]["text"] for i in positions]
+        keys = [records[i]["content_hash"] for i in positions]
+        try:
+            scores = self.score_batch(texts, job, batch_size=batch_size, content_keys=keys if all(keys) else None)
+        except Exception as e:
+            logger.error(f"Batch scoring failed: {e}")
+            scores = None
+
+        scored, scored_rows = [], []
+        for row, i in enumerate(positions):
+            if scores is None:
+                results[i] = self._failed_result("Batch scoring failed")
+                continue
+            scored.append(i)
+            scored_rows.append(row)
+            results[i] = {
+                "overall_match_score": float(scores.overall_match_score[row]),
+                "keywords_matched": scores.keywords_matched(row),
+                "semantic_relevance": float(scores.semantic_relevance[row]),
+                "summary": scores.summary[row],
+                "ocr_pages": records[i]["ocr_pages"],
+                "ocr_errors": records[i]["ocr_errors"],
+                "timings": {**records[i]["timings"], **scores.timings[row]}
+            }
+
+        if index is not None and scored and all(records[i]["content_hash"] for i in scored):
+            # The vectors used for ranking go into the index; nothing is re-encoded
+            embeddings = scores.embeddings[scored_rows] if scores.embeddings is not None else None
+            try:
+                self.add_to_index(index, [records[i]["text"] for i in scored],
+                                  [records[i]["content_hash"] for i in scored],
+                                  [records[i]["name"] for i in scored], batch_size=batch_size, embeddings=embeddings)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not update resume index: {e}")
+
+        for record, result in zip(records, results):
+            result.update(name=record["name"], content_hash=record["content_hash"], contacts=record["contacts"])
+            result.setdefault("timings", record["timings"])
+        return results
+
+    def _failed_result(self, error) -> Dict:
+        return {
+            "Error": str(error),
+            "overall_match_score": 0.0,
+            "keywords_matched": [],
+            "semantic_relevance": 0.0,
+            "summary": "Processing failed"
+        }
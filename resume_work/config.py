@@ -17,4 +17,12 @@ def get_save_directory(default=None):
 
     # Fallback to default
     print(f"📁 Using default save directory: {default}")
-    return default
\ No newline at end of file
+    return default
+
+def get_cache_directory():
+    """Directory for on-disk caches (override with CV_SCANNER_CACHE_DIR)."""
+    path = os.environ.get("CV_SCANNER_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "bitskraft-cv-scanner"
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,115 @@
+# contact_extraction.py
+import re
+from typing import Dict, Optional
+
+# One alternation finds every contact field in a single pass over the text.
+# Every branch starts at one of a few trigger characters, and the leading
+# lookahead lets the regex engine skip all other positions cheaply. Parts
+# that would need a common leading character (an email's local part, a
+# URL's "https://www.") are read backwards from the match instead.
+# "LinkedIn: handle" fallbacks are not part of the alternation: a handle
+# branch would consume the URL or phone number that follows its label.
+_CONTACT_PATTERN = re.compile(
+    r"""
+    (?=[@+0-9lLgG])
+    (?:
+        (?P<email_domain>@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)
+      | (?P<linkedin_url>linkedin\.com/in/[\w-]+)
+      | (?P<github_url>github\.com/[\w-]+)
+      | (?P<phone>\+?977\d{10}|\b\d{10}\b)
+    )
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+_LINKEDIN_HANDLE = re.compile(r"linkedin[^\w]*[:\s][^\w]*([\w-]{5,})", re.IGNORECASE)
+_GITHUB_HANDLE = re.compile(r"git(?:hub)?[^\w]*[:\s][^\w]*([\w-]{3,})", re.IGNORECASE)
+_URL_SCHEME = re.compile(r"https?://(?:www\.)?$", re.IGNORECASE)
+_EMAIL_LOCAL_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.+-")
+_NON_DIGIT = re.compile(r"\D")
+_NAME = re.compile(r"[nN][aA][mM][eE]")
+_FIRST_LINE = re.compile(r"^[ \t\r\f\v]*(\S[^\n]*?)\s*$", re.MULTILINE)
+
+
+def normalize_phone(num: str) -> Optional[str]:
+    digits = _NON_DIGIT.sub("", num)
+    if digits.startswith("977") and len(digits) == 13:
+        return "+977" + digits[3:]
+    elif len(digits) == 10:
+        return digits
+    return None
+
+
+def _url(text: str, match, kind: str):
+    """Return (url, has_scheme) for a bare "linkedin.com/in/..." style match."""
+    start = match.start(kind)
+    scheme = _URL_SCHEME.search(text, max(0, start - 12), start)
+    if scheme:
+        return text[scheme.start():match.end(kind)], True
+    return f"https://{match.group(kind)}", False
+
+
+def extract_name(text: str) -> Optional[str]:
+    """
+    Value of the first line mentioning "name" ("Name: Jane Doe"), otherwise
+    the first non-empty line.
+    """
+    match = _NAME.search(text)
+    if match:
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        line_end = text.find("\n", match.end())
+        line = text[line_start:line_end if line_end != -1 else len(text)]
+        name = line.split(":")[-1].strip()
+        if name:
+            return name
+    match = _FIRST_LINE.search(text)
+    return match.group(1) if match else None
+
+
+def extract_contacts(text: str) -> Dict[str, str]:
+    """
+    Pull name, email, phone, LinkedIn and GitHub from resume text.
+    :return: {"Name", "Email", "Phone", "LinkedIn", "GitHub"}; missing values are "Unknown"
+             (Phone is "" when none is found). Multiple emails/phones are joined with ",  ".
+    """
+    emails, phones = [], []
+    # Per profile: [URL with scheme, bare URL], best first
+    linkedin = [None, None]
+    github = [None, None]
+
+    for match in _CONTACT_PATTERN.finditer(text):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "email_domain":
+            start = match.start()
+            while start > 0 and text[start - 1] in _EMAIL_LOCAL_CHARS:
+                start -= 1
+            if start < match.start():
+                emails.append(text[start:match.end()])
+        elif kind == "phone":
+            phone = normalize_phone(value)
+            if phone:
+                phones.append(phone)
+        elif kind in ("linkedin_url", "github_url"):
+            slots = linkedin if kind == "linkedin_url" else github
+            url, has_scheme = _url(text, match, kind)
+            slot = 0 if has_scheme else 1
+            if slots[slot] is None:
+                slots[slot] = url
+
+    return {
+        "Name": extract_name(text) or "Unknown",
+        "Email": ",  ".join(emails) or "Unknown",
+        "Phone": ",  ".join(phones),
+        "LinkedIn": _profile(text, linkedin, _LINKEDIN_HANDLE, "https://linkedin.com/in/"),
+        "GitHub": _profile(text, github, _GITHUB_HANDLE, "https://github.com/"),
+    }
+
+
+def _profile(text: str, urls, handle_pattern, prefix: str) -> str:
+    """Best URL found, else a labelled handle ("GitHub: janedoe"), else "Unknown"."""
+    url = next((url for url in urls if url), None)
+    if url:
+        return url
+    # Second pass only for documents without a profile URL
+    match = handle_pattern.search(text)
+    return f"{prefix}{match.group(1).strip()}" if match else "Unknown"
@@ -0,0 +1,269 @@
+# email_outbox.py
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from resume_work.config import get_cache_directory
+from resume_work.email_sender import FAILED, SENT, EmailSender, get_email_sender
+
+logger = logging.getLogger(__name__)
+
+QUEUED, SENDING = "queued", "sending"
+OUTBOX_STATUSES = (QUEUED, SENDING, SENT, FAILED)
+
+_COLUMNS = ("idempotency_key", "job_key", "sender_email", "recipient_email", "subject", "body",
+            "html_body", "status", "attempts", "error", "created", "updated", "sent_at")
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def idempotency_key(recipient_email: str, job_key: str, template: Dict[str, str]) -> str:
+    """
+    Key of one (candidate, job, template) email: the same candidate is emailed
+    at most once per job description and template text, however often the
+    send button is pressed.
+    """
+    template_key = _sha256(f"{template.get('subject', '')}\x00{template.get('body', '')}")
+    return _sha256(f"{recipient_email.strip().lower()}\x00{job_key}\x00{template_key}")
+
+
+def job_key_for(job_description: str) -> str:
+    """Stable job identity for idempotency keys: hash of the job description text."""
+    return _sha256(" ".join(job_description.split()))
+
+
+class EmailOutbox:
+    """
+    Durable email queue backed by SQLite. Messages are enqueued with an
+    idempotency key, so re-enqueueing an already queued or sent message is a
+    no-op, and delivery state survives page reruns and process restarts.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_cache_directory(), "email_outbox.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                idempotency_key TEXT PRIMARY KEY,
+                job_key         TEXT NOT NULL,
+                sender_email    TEXT NOT NULL,
+                recipient_email TEXT NOT NULL,
+                subject         TEXT NOT NULL,
+                body            TEXT NOT NULL,
+                html_body       TEXT,
+                status          TEXT NOT NULL,
+                attempts        INTEGER NOT NULL DEFAULT 0,
+                error           TEXT,
+                created         REAL NOT NULL,
+                updated         REAL NOT NULL,
+                sent_at         REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status, created)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_job ON outbox(job_key, created)")
+        self._conn.commit()
+
+    def enqueue(self, messages: Iterable[Dict], sender_email: str, job_key: str = "",
+                template: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+        """
+        Queue messages for delivery.
+        :param messages: Dicts with "recipient_email", "subject", "body" and
+            optionally "html_body"
+        :param job_key: Job identity (see job_key_for) used in the idempotency key
+        :param template: Unrendered {"subject", "body"} template used in the
+            idempotency key; defaults to each message's own subject and body
+        :return: {"queued": [emails], "duplicates": [emails already queued or sent]}
+        """
+        queued, duplicates = [], []
+        now = time.time()
+        with self._lock:
+            for message in messages:
+                key = idempotency_key(message["recipient_email"], job_key, template or message)
+                cursor = self._conn.execute(
+                    """
+                    INSERT OR IGNORE INTO outbox (idempotency_key, job_key, sender_email, recipient_email,
+                                                  subject, body, html_body, status, created, updated)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (key, job_key, sender_email, message["recipient_email"], message["subject"],
+                     message["body"], message.get("html_body"), QUEUED, now, now)
+                )
+                (queued if cursor.rowcount else duplicates).append(message["recipient_email"])
+            self._conn.commit()
+        if queued:
+            logger.info(f"✅ Queued {len(queued)} emails ({len(duplicates)} already queued or sent)")
+        return {"queued": queued, "duplicates": duplicates}
+
+    def claim(self, limit: int = 20) -> List[Dict]:
+        """Move up to ``limit`` queued messages (oldest first) to "sending" and return them."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM outbox WHERE status = ? ORDER BY created LIMIT ?", (QUEUED, limit)
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE outbox SET status = ?, updated = ? WHERE idempotency_key = ?",
+                    [(SENDING, time.time(), row["idempotency_key"]) for row in rows]
+                )
+                self._conn.commit()
+        return [dict(row) for row in rows]
+
+    def complete(self, results: Iterable[Dict]):
+        """
+        Record delivery outcomes.
+        :param results: Dicts with "idempotency_key", "status" ("sent"/"failed"),
+            "attempts" and "error", e.g. send_bulk statuses with the key added
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """
+                UPDATE outbox SET status = ?, attempts = attempts + ?, error = ?, updated = ?,
+                                  sent_at = CASE WHEN ? = 'sent' THEN ? ELSE sent_at END
+                WHERE idempotency_key = ?
+                """,
+                [(r["status"], r.get("attempts", 1), r.get("error"), now, r["status"], now, r["idempotency_key"])
+                 for r in results]
+            )
+            self._conn.commit()
+
+    def recover(self) -> int:
+        """
+        Requeue messages left in "sending" by a worker that died. A message whose
+        delivery finished just before the crash can be sent a second time;
+        every other message is sent at most once.
+        """
+        with self._lock:
+            count = self._conn.execute(
+                "UPDATE outbox SET status = ?, updated = ? WHERE status = ?", (QUEUED, time.time(), SENDING)
+            ).rowcount
+            self._conn.commit()
+        if count:
+            logger.warning(f"⚠️ Requeued {count} emails interrupted while sending")
+        return count
+
+    def retry_failed(self, job_key: Optional[str] = None) -> int:
+        """Queue failed messages (optionally of one job) again."""
+        query, params = "UPDATE outbox SET status = ?, updated = ? WHERE status = ?", [QUEUED, time.time(), FAILED]
+        if job_key is not None:
+            query += " AND job_key = ?"
+            params.append(job_key)
+        with self._lock:
+            count = self._conn.execute(query, params).rowcount
+            self._conn.commit()
+        return count
+
+    def counts(self, job_key: Optional[str] = None) -> Dict[str, int]:
+        """Number of messages per status."""
+        query, params = "SELECT status, COUNT(*) FROM outbox", []
+        if job_key is not None:
+            query += " WHERE job_key = ?"
+            params.append(job_key)
+        with self._lock:
+            found = dict(self._conn.execute(query + " GROUP BY status", params).fetchall())
+        return {status: found.get(status, 0) for status in OUTBOX_STATUSES}
+
+    def entries(self, job_key: Optional[str] = None, limit: int = 500) -> List[Dict]:
+        """Messages without their bodies, newest first."""
+        columns = ", ".join(c for c in _COLUMNS if c not in ("body", "html_body"))
+        query, params = f"SELECT {columns} FROM outbox", []
+        if job_key is not None:
+            query += " WHERE job_key = ?"
+            params.append(job_key)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created DESC LIMIT ?", params + [limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class OutboxWorker:
+    """
+    Background thread that drains an EmailOutbox in batches through the
+    configured email backend (one sender per From address, reused across
+    batches while there is work).
+    """
+
+    def __init__(self, outbox: EmailOutbox,
+                 sender_factory: Callable[[str], EmailSender] = get_email_sender,
+                 batch_size: int = 20, poll_interval: float = 2.0):
+        self.outbox = outbox
+        self.sender_factory = sender_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "OutboxWorker":
+        if self._thread is None:
+            self.outbox.recover()
+            self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def wake(self):
+        """Start on newly queued messages now rather than at the next poll."""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def drain(self) -> int:
+        """Send queued messages until the outbox is empty; returns how many were processed."""
+        senders: Dict[str, EmailSender] = {}
+        processed = 0
+        try:
+            while not self._stop.is_set():
+                batch = self.outbox.claim(self.batch_size)
+                if not batch:
+                    break
+                by_sender: Dict[str, List[Dict]] = {}
+                for row in batch:
+                    by_sender.setdefault(row["sender_email"], []).append(row)
+                for sender_email, rows in by_sender.items():
+                    self.outbox.complete(self._send(senders, sender_email, rows))
+                processed += len(batch)
+        finally:
+            for sender in senders.values():
+                sender.close()
+        return processed
+
+    def _send(self, senders: Dict[str, EmailSender], sender_email: str, rows: List[Dict]) -> List[Dict]:
+        try:
+            if sender_email not in senders:
+                senders[sender_email] = self.sender_factory(sender_email)
+            statuses = senders[sender_email].send_bulk(
+                {"recipient_email": row["recipient_email"], "subject": row["subject"],
+                 "body": row["body"], "html_body": row["html_body"]}
+                for row in rows
+            )
+        except Exception as e:
+            logger.error(f"❌ Email batch from {sender_email} failed: {e}")
+            statuses = [{"status": FAILED, "attempts": 1, "error": str(e)} for _ in rows]
+        return [{**status, "idempotency_key": row["idempotency_key"]} for row, status in zip(rows, statuses)]
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.drain()
+            except Exception as e:
+                logger.error(f"❌ Email outbox worker error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
@@ -1,103 +1,367 @@
 # email_sender.py
-import win32com.client
-import pythoncom
-import streamlit as st
-import pandas as pd
-from datetime import datetime
-import time
+import logging
 import os
+import queue
+import random
+import smtplib
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from typing import Callable, Dict, Iterable, List, Optional
 
-class OutlookEmailSender:
-    def __init__(self, email_account):
+logger = logging.getLogger(__name__)
+
+SENT, FAILED = "sent", "failed"
+
+# Connection-level failures are always retried; see SMTPEmailSender.is_transient
+_TRANSIENT_SMTP_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows ``rate`` sends per second on average with
+    bursts of up to ``capacity``. acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[int] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class EmailSender:
+    """
+    Base class of the email backends. Subclasses implement deliver(), which
+    raises on failure, and is_transient() to tell retryable errors apart.
+    """
+
+    # Concurrent deliveries the backend supports
+    max_workers = 1
+
+    def __init__(self, email_account: str):
         self.email_account = email_account
-    
+
+    def deliver(self, recipient_email: str, subject: str, body: str,
+                html_body: Optional[str] = None, attachment_path: Optional[str] = None):
+        raise NotImplementedError
+
+    def is_transient(self, error: Exception) -> bool:
+        return False
+
+    def release_thread(self):
+        """Free per-thread backend state; called by every send_bulk worker when it ends."""
+
+    def close(self):
+        pass
+
     def send_email(self, recipient_email, subject, body, html_body=None, attachment_path=None):
         """
-        Send email using Outlook desktop application
-        
-        Args:
-            recipient_email (str): Email address of the recipient
-            subject (str): Email subject
-            body (str): Plain text email body
-            html_body (str, optional): HTML formatted email body
-            attachment_path (str, optional): Path to attachment file
-        
-        Returns:
-            bool: True if email sent successfully, False otherwise
+        Send one email.
+        :return: True if the email was sent successfully, False otherwise
         """
-        pythoncom.CoInitialize()
         try:
-            # Create Outlook application instance
-            outlook = win32com.client.Dispatch("Outlook.Application")
-            
-            # Create a new mail item
-            mail = outlook.CreateItem(0)  # 0 = olMailItem
-            
-            # Set email properties
-            mail.To = recipient_email
-            mail.Subject = subject
-            
-            # Use HTML body if provided, otherwise plain text
-            if html_body:
-                mail.HTMLBody = html_body
-            else:
-                mail.Body = body
-            
-            # Add attachment if provided
-            if attachment_path and os.path.exists(attachment_path):
-                mail.Attachments.Add(attachment_path)
-            
-            # Send the email
-            mail.Send()
-            
+            self.deliver(recipient_email, subject, body, html_body=html_body, attachment_path=attachment_path)
             return True
-            
         except Exception as e:
-            st.error(f"Error sending email to {recipient_email}: {str(e)}")
+            logger.error(f"❌ Error sending email to {recipient_email}: {e}")
             return False
-        finally:
+
+    def send_bulk(self, messages: Iterable[Dict], workers: Optional[int] = None, rate: Optional[float] = None,
+                  retries: int = 3, backoff: float = 1.0,
+                  progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+        """
+        Send many emails concurrently, rate limited, retrying transient failures
+        with exponential backoff.
+        :param messages: Dicts with "recipient_email", "subject", "body" and
+            optionally "html_body" / "attachment_path"
+        :param workers: Concurrent sends (default: the backend's max_workers)
+        :param rate: Sends per second across all workers (default:
+            CV_SCANNER_EMAIL_RATE or 5; 0 disables the limit)
+        :param retries: Extra attempts after a transient failure
+        :param backoff: Base delay in seconds, doubled on every retry
+        :param progress_callback: Called with (finished, total) after each message
+        :return: One status dict per message, in input order:
+            {"recipient_email", "status" ("sent"/"failed"), "attempts", "error"}
+        """
+        messages = list(messages)
+        if rate is None:
+            rate = float(os.environ.get("CV_SCANNER_EMAIL_RATE", "5"))
+        bucket = TokenBucket(rate)
+        pending: "queue.Queue[int]" = queue.Queue()
+        for i in range(len(messages)):
+            pending.put(i)
+        results: List[Optional[Dict]] = [None] * len(messages)
+        finished = [0]
+        lock = threading.Lock()
+
+        def send(message: Dict) -> Dict:
+            status = {"recipient_email": message["recipient_email"], "status": FAILED, "attempts": 0, "error": None}
+            while True:
+                bucket.acquire()
+                status["attempts"] += 1
+                try:
+                    self.deliver(**message)
+                    status.update(status=SENT, error=None)
+                    return status
+                except Exception as e:
+                    status["error"] = str(e)
+                    if status["attempts"] > retries or not self.is_transient(e):
+                        logger.error(f"❌ Error sending email to {message['recipient_email']}: {e}")
+                        return status
+                    time.sleep(backoff * 2 ** (status["attempts"] - 1) * (1 + random.random() * 0.1))
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        i = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    results[i] = send(messages[i])
+                    with lock:
+                        finished[0] += 1
+                        if progress_callback:
+                            progress_callback(finished[0], len(messages))
+            finally:
+                self.release_thread()
+
+        workers = max(1, min(workers or self.max_workers, len(messages) or 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="email") as executor:
+            for future in [executor.submit(worker) for _ in range(workers)]:
+                future.result()
+        sent = sum(result["status"] == SENT for result in results)
+        logger.info(f"✅ Sent {sent}/{len(results)} emails")
+        return results
+
+
+class SMTPEmailSender(EmailSender):
+    """
+    Sends through an SMTP server, reusing a small pool of authenticated
+    connections across messages and threads.
+    """
+
+    def __init__(self, email_account: str, host: str = "localhost", port: int = 25,
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = False, use_ssl: bool = False, timeout: float = 30.0,
+                 max_connections: int = 4):
+        super().__init__(email_account)
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.max_workers = max_connections
+        self._pool: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+
+    @classmethod
+    def from_env(cls, email_account: str) -> "SMTPEmailSender":
+        """Configured from CV_SCANNER_SMTP_HOST/_PORT/_USER/_PASSWORD/_STARTTLS/_SSL/_CONNECTIONS."""
+        env = os.environ.get
+        return cls(
+            email_account,
+            host=env("CV_SCANNER_SMTP_HOST", "localhost"),
+            port=int(env("CV_SCANNER_SMTP_PORT", "25")),
+            username=env("CV_SCANNER_SMTP_USER") or None,
+            password=env("CV_SCANNER_SMTP_PASSWORD") or None,
+            starttls=env("CV_SCANNER_SMTP_STARTTLS", "0") == "1",
+            use_ssl=env("CV_SCANNER_SMTP_SSL", "0") == "1",
+            max_connections=int(env("CV_SCANNER_SMTP_CONNECTIONS", "4")),
+        )
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                conn.starttls(context=ssl.create_default_context())
+        if self.username:
+            conn.login(self.username, self.password or "")
+        return conn
+
+    def _acquire(self) -> smtplib.SMTP:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    @staticmethod
+    def _discard(conn: smtplib.SMTP):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def deliver(self, recipient_email, subject, body, html_body=None, attachment_path=None):
+        message = EmailMessage()
+        message["From"] = self.email_account
+        message["To"] = recipient_email
+        message["Subject"] = subject
+        message.set_content(body or "")
+        if html_body:
+            message.add_alternative(html_body, subtype="html")
+        if attachment_path and os.path.exists(attachment_path):
+            with open(attachment_path, "rb") as f:
+                message.add_attachment(f.read(), maintype="application", subtype="octet-stream",
+                                       filename=os.path.basename(attachment_path))
+
+        conn = self._acquire()
+        try:
+            try:
+                conn.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                # Pooled connections can be dropped by the server while idle
+                self._discard(conn)
+                conn = self._connect()
+                conn.send_message(message)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+            # The server rejected this message; the connection itself is fine
+            self._pool.put(conn)
+            raise
+        except Exception:
+            self._discard(conn)
+            raise
+        self._pool.put(conn)
+
+    def is_transient(self, error: Exception) -> bool:
+        if isinstance(error, _TRANSIENT_SMTP_ERRORS):
+            return True
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return all(400 <= code < 500 for code, _ in error.recipients.values())
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+    def close(self):
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.quit()
+            except Exception:
+                self._discard(conn)
+
+
+class OutlookEmailSender(EmailSender):
+    """
+    Sends through the Outlook desktop application (Windows only). pywin32 is
+    imported on first use; each thread initialises COM and creates the
+    Outlook application object once and reuses it.
+    """
+
+    def __init__(self, email_account):
+        super().__init__(email_account)
+        self._local = threading.local()
+
+    def _outlook(self):
+        outlook = getattr(self._local, "outlook", None)
+        if outlook is None:
+            import pythoncom
+            import win32com.client
+            pythoncom.CoInitialize()
+            outlook = self._local.outlook = win32com.client.Dispatch("Outlook.Application")
+        return outlook
+
+    def deliver(self, recipient_email, subject, body, html_body=None, attachment_path=None):
+        # Create a new mail item
+        mail = self._outlook().CreateItem(0)  # 0 = olMailItem
+
+        # Set email properties
+        mail.To = recipient_email
+        mail.Subject = subject
+
+        # Use HTML body if provided, otherwise plain text
+        if html_body:
+            mail.HTMLBody = html_body
+        else:
+            mail.Body = body
+
+        # Add attachment if provided
+        if attachment_path and os.path.exists(attachment_path):
+            mail.Attachments.Add(attachment_path)
+
+        # Send the email
+        mail.Send()
+
+    def release_thread(self):
+        if getattr(self._local, "outlook", None) is not None:
+            import pythoncom
+            self._local.outlook = None
             pythoncom.CoUninitialize()
 
-def send_bulk_emails(top_candidates_df, email_template, sender_email):
+    def close(self):
+        self.release_thread()
+
+
+EMAIL_BACKENDS = ("smtp", "outlook")
+
+
+def get_email_sender(email_account: str, backend: Optional[str] = None) -> EmailSender:
+    """
+    Sender for the configured backend: ``backend``, else CV_SCANNER_EMAIL_BACKEND,
+    else "outlook" on Windows and "smtp" everywhere else.
+    """
+    backend = backend or os.environ.get("CV_SCANNER_EMAIL_BACKEND") or ("outlook" if os.name == "nt" else "smtp")
+    if backend not in EMAIL_BACKENDS:
+        raise ValueError(f"email backend must be one of {EMAIL_BACKENDS}")
+    if backend == "outlook":
+        return OutlookEmailSender(email_account)
+    return SMTPEmailSender.from_env(email_account)
+
+
+def send_bulk_emails(top_candidates_df, email_template, sender_email, outbox=None, job_key="", position=None):
     """
-    Send emails to top candidates
-    
+    Queue emails to top candidates in the email outbox; an OutboxWorker
+    delivers them in the background. A candidate already queued or emailed
+    for the same job and template is skipped.
+
     Args:
         top_candidates_df (DataFrame): DataFrame containing top candidates
-        email_template (dict): Template for email content
+        email_template (dict): Template for email content ("subject", "body",
+            optional "html_body"); see email_templates.EmailTemplate
         sender_email (str): Your email address for the sender field
-    
+        outbox (EmailOutbox, optional): Outbox to queue into (default: the shared one)
+        job_key (str, optional): Job identity, see email_outbox.job_key_for
+        position (str, optional): Job position for {position}; defaults to a
+            'Position' column, then "the position"
+
     Returns:
-        list: List of emails that were sent successfully
+        list: List of emails that were queued
+
+    Raises:
+        TemplateError: If the template uses placeholders with no value source
     """
-    successful_emails = []
-    sender = OutlookEmailSender(sender_email)
-    
-    for index, candidate in top_candidates_df.iterrows():
-        # Personalize the email content
-        personalized_body = email_template['body'].format(
-            candidate_name=candidate.get('Name', 'Candidate'),
-            position=candidate.get('Position', 'the position'),
-            company_name="Bitskraft"
-        )
-        
-        personalized_subject = email_template['subject'].format(
-            position=candidate.get('Position', 'Position')
-        )
-        
-        # Send email
-        success = sender.send_email(
-            recipient_email=candidate['Email'],
-            subject=personalized_subject,
-            body=personalized_body
-        )
-        
-        if success:
-            successful_emails.append(candidate['Email'])
-            # Add delay to avoid overwhelming Outlook
-            time.sleep(2)
-    
-    return successful_emails
+    from resume_work.email_outbox import EmailOutbox
+    from resume_work.email_templates import EmailTemplate
+
+    template = EmailTemplate.from_dict(email_template)
+    messages = template.messages(top_candidates_df, context={"position": position})
+
+    outbox = outbox or EmailOutbox()
+    return outbox.enqueue(messages, sender_email, job_key=job_key, template=email_template)["queued"]
 
 # Default email template
 DEFAULT_EMAIL_TEMPLATE = {
@@ -117,4 +381,4 @@ If you have any questions in the meantime, please don't hesitate to reach out.
 
 Best regards,
 The Bitskraft Hiring Team"""
-}
\ No newline at end of file
+}
@@ -0,0 +1,159 @@
+# email_templates.py
+import html
+from string import Formatter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+# Template placeholder -> candidate table column it is filled from
+PLACEHOLDER_COLUMNS = {
+    "candidate_name": "Name",
+    "email": "Email",
+    "phone": "Phone",
+    "rank": "Rank",
+    "score": "Overall Match Score",
+    "semantic_relevance": "Semantic Relevance",
+    "keywords_matched": "Keywords Matched",
+    "summary": "Summary",
+    "position": "Position",
+}
+
+# Used when a placeholder has no context value, column or cell value
+DEFAULT_VALUES = {
+    "candidate_name": "Candidate",
+    "position": "the position",
+    "company_name": "Bitskraft",
+}
+
+
+class TemplateError(ValueError):
+    """A template that cannot be parsed or uses placeholders with no value source."""
+
+
+class _CompiledText:
+    """One template string split once into literal text and placeholder fields."""
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.parts: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        try:
+            for literal, field, spec, conversion in Formatter().parse(text):
+                if field is not None and (not field.isidentifier()):
+                    raise TemplateError(f"{name}: placeholder {{{field}}} must be a plain name like {{candidate_name}}")
+                self.parts.append((literal, field, spec or "", conversion))
+        except ValueError as e:
+            if isinstance(e, TemplateError):
+                raise
+            raise TemplateError(f"{name}: {e} (use {{{{ and }}}} for literal braces)") from e
+        self.fields = {field for _, field, _, _ in self.parts if field is not None}
+
+    def render(self, values: Dict[str, pd.Series], index: pd.Index, escape: bool = False) -> pd.Series:
+        out = pd.Series("", index=index, dtype=object)
+        for literal, field, spec, conversion in self.parts:
+            if literal:
+                out = out + literal
+            if field is None:
+                continue
+            column = values[field]
+            if spec or conversion:
+                convert = {"r": repr, "s": str, "a": ascii}.get(conversion, lambda v: v)
+                try:
+                    column = column.map(lambda v: format(convert(v), spec))
+                except (TypeError, ValueError) as e:
+                    raise TemplateError(f"{self.name}: cannot format {{{field}:{spec}}}: {e}") from e
+            else:
+                column = column.astype(str)
+            if escape:
+                column = column.map(html.escape)
+            out = out + column
+        return out
+
+
+class EmailTemplate:
+    """
+    Email template parsed and validated once, then rendered for a whole
+    candidate table with column-wise string operations.
+
+    Placeholders use str.format syntax ({candidate_name}, {score:.1f}) and are
+    filled, in order of precedence, from the render context, the candidate
+    column in PLACEHOLDER_COLUMNS (or a column of the same name), and
+    DEFAULT_VALUES. Values inserted into the HTML body are HTML-escaped.
+    """
+
+    def __init__(self, subject: str, body: str, html_body: Optional[str] = None):
+        self.subject = _CompiledText("Subject", subject)
+        self.body = _CompiledText("Body", body)
+        self.html_body = _CompiledText("HTML body", html_body) if html_body else None
+
+    @classmethod
+    def from_dict(cls, template: Dict[str, str]) -> "EmailTemplate":
+        return cls(template["subject"], template["body"], template.get("html_body"))
+
+    @property
+    def placeholders(self) -> List[str]:
+        fields = self.subject.fields | self.body.fields | (self.html_body.fields if self.html_body else set())
+        return sorted(fields)
+
+    def missing_placeholders(self, columns: Iterable[str], context: Optional[Dict] = None) -> List[str]:
+        """Placeholders that neither the context, the columns nor DEFAULT_VALUES can fill."""
+        columns = set(columns)
+        return [
+            field for field in self.placeholders
+            if field not in (context or {}) and field not in DEFAULT_VALUES
+            and PLACEHOLDER_COLUMNS.get(field) not in columns and field not in columns
+        ]
+
+    def validate(self, columns: Iterable[str], context: Optional[Dict] = None):
+        """Raise TemplateError if any placeholder has no value source."""
+        missing = self.missing_placeholders(columns, context)
+        if missing:
+            known = sorted(set(PLACEHOLDER_COLUMNS) | set(DEFAULT_VALUES) | set(context or {}))
+            raise TemplateError(
+                f"Unknown placeholder(s): {', '.join('{' + f + '}' for f in missing)}. "
+                f"Available: {', '.join('{' + f + '}' for f in known)}"
+            )
+
+    def _values(self, candidates: pd.DataFrame, context: Dict) -> Dict[str, pd.Series]:
+        values = {}
+        for field in self.placeholders:
+            if field in context:
+                values[field] = pd.Series([context[field]] * len(candidates), index=candidates.index, dtype=object)
+                continue
+            column = PLACEHOLDER_COLUMNS.get(field)
+            column = column if column in candidates.columns else field
+            default = DEFAULT_VALUES.get(field, "")
+            if column in candidates.columns:
+                series = candidates[column].astype(object)
+                values[field] = series.where(series.notna() & (series.astype(str).str.strip() != ""), default)
+            else:
+                values[field] = pd.Series([default] * len(candidates), index=candidates.index, dtype=object)
+        return values
+
+    def render(self, candidates: pd.DataFrame, context: Optional[Dict] = None) -> pd.DataFrame:
+        """
+        Render every candidate row.
+        :param candidates: Candidate table (e.g. the Final Ranked Results rows)
+        :param context: Values shared by all rows, e.g. {"position": ..., "company_name": ...}
+        :return: DataFrame aligned with ``candidates`` with "subject", "body"
+            and "html_body" (None without an HTML template) columns
+        """
+        context = {k: v for k, v in (context or {}).items() if v is not None and str(v).strip() != ""}
+        self.validate(candidates.columns, context)
+        values = self._values(candidates, context)
+        return pd.DataFrame({
+            "subject": self.subject.render(values, candidates.index),
+            "body": self.body.render(values, candidates.index),
+            "html_body": (self.html_body.render(values, candidates.index, escape=True)
+                          if self.html_body else pd.Series(None, index=candidates.index, dtype=object)),
+        }, index=candidates.index)
+
+    def messages(self, candidates: pd.DataFrame, context: Optional[Dict] = None,
+                 email_column: str = "Email") -> List[Dict]:
+        """Rendered send_bulk / EmailOutbox message dicts, one per candidate row."""
+        rendered = self.render(candidates, context)
+        return [
+            {"recipient_email": str(email).strip(), "subject": subject, "body": body, "html_body": html_body}
+            for email, subject, body, html_body in zip(
+                candidates[email_column], rendered["subject"], rendered["body"], rendered["html_body"]
+            )
+        ]
@@ -0,0 +1,185 @@
+# embedding_cache.py
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from resume_work.config import get_cache_directory
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever text extraction or preprocess_text changes, so stale entries
+# are no longer served.
+PREPROCESS_VERSION = "2"
+
+
+def content_hash(content: bytes) -> str:
+    """SHA-256 hex digest of raw file bytes."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent cache of extracted resume text and float32 embeddings, keyed
+    by the SHA-256 of the file bytes plus model name, encoder backend and
+    preprocessing version. Backed by SQLite, capped at ``max_bytes`` with
+    LRU eviction.
+    """
+
+    def __init__(self, path: Optional[str] = None, model_name: str = "all-MiniLM-L6-v2",
+                 version: str = PREPROCESS_VERSION, max_bytes: int = 512 * 1024 * 1024,
+                 backend: str = "torch"):
+        self.path = path or os.path.join(get_cache_directory(), "embeddings.sqlite3")
+        self.model_name = model_name
+        self.backend = backend
+        # Quantised backends give slightly different vectors, so they get their own namespace
+        self.namespace = f"{model_name}/{version}" if backend == "torch" else f"{model_name}/{backend}/{version}"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace   TEXT NOT NULL,
+                hash        TEXT NOT NULL,
+                text        TEXT,
+                ocr_pages   TEXT,
+                embedding   BLOB,
+                size        INTEGER NOT NULL DEFAULT 0,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, hash)
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        if "ocr_pages" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN ocr_pages TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries(last_access)")
+        self._conn.commit()
+
+    def get_text(self, key: str) -> Optional[str]:
+        """Cached extracted text, or None on a miss. Empty string means 'no text'."""
+        document = self.get_document(key)
+        return document[0] if document is not None else None
+
+    def get_document(self, key: str) -> Optional[Tuple[str, List[int]]]:
+        """Cached (text, OCR'd page numbers), or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, ocr_pages FROM entries WHERE namespace = ? AND hash = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None or row[0] is None:
+                return None
+            self._touch([key])
+            return row[0], [int(page) for page in (row[1] or "").split(",") if page]
+
+    def get_embeddings(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Cached embeddings for the given keys; missing keys are omitted."""
+        found = {}
+        if not keys:
+            return found
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, embedding FROM entries WHERE namespace = ? "
+                    f"AND hash IN ({placeholders}) AND embedding IS NOT NULL",
+                    (self.namespace, *chunk)
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            self._touch(list(found))
+        return found
+
+    def put_text(self, key: str, text: str, ocr_pages: Optional[List[int]] = None):
+        """
+        Cache extracted text. Only cache complete extractions: text from
+        failed OCR would otherwise be served for good.
+        :param ocr_pages: 1-based page numbers whose text came from OCR
+        """
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO entries (namespace, hash, text, ocr_pages, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(namespace, hash) DO UPDATE SET
+                    text = excluded.text,
+                    ocr_pages = excluded.ocr_pages,
+                    size = LENGTH(CAST(excluded.text AS BLOB)) + IFNULL(LENGTH(embedding), 0),
+                    last_access = excluded.last_access
+                """,
+                (self.namespace, key, text, ",".join(map(str, ocr_pages or [])),
+                 len(text.encode("utf-8")), time.time())
+            )
+            self._conn.commit()
+            self._evict()
+
+    def put_embeddings(self, embeddings: Dict[str, np.ndarray]):
+        if not embeddings:
+            return
+        now = time.time()
+        rows = []
+        for key, emb in embeddings.items():
+            blob = np.asarray(emb, dtype=np.float32).tobytes()
+            rows.append((self.namespace, key, blob, len(blob), now))
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO entries (namespace, hash, embedding, size, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(namespace, hash) DO UPDATE SET
+                    embedding = excluded.embedding,
+                    size = IFNULL(LENGTH(CAST(text AS BLOB)), 0) + LENGTH(excluded.embedding),
+                    last_access = excluded.last_access
+                """,
+                rows
+            )
+            self._conn.commit()
+            self._evict()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT IFNULL(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _touch(self, keys: List[str]):
+        if keys:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE entries SET last_access = ? WHERE namespace = ? AND hash = ?",
+                [(now, self.namespace, key) for key in keys]
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        total = self._conn.execute("SELECT IFNULL(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for namespace, key, size in self._conn.execute(
+            "SELECT namespace, hash, size FROM entries ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE namespace = ? AND hash = ?", (namespace, key))
+            total -= size
+            evicted += 1
+        self._conn.commit()
+        logger.info(f"🧹 Evicted {evicted} cache entries ({total} bytes remain)")
@@ -0,0 +1,129 @@
+# ingest.py
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from resume_work.contact_extraction import extract_contacts
+from resume_work.embedding_cache import EmbeddingCache, content_hash
+from resume_work.metrics import METRICS
+from resume_work.text_extraction import ExtractionPool, extract_document, run_in_pool
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = {".pdf": "pdf", ".docx": "docx"}
+
+
+def file_format_for(name: str) -> Optional[str]:
+    """'pdf' / 'docx' from a file name, or None when unsupported."""
+    return SUPPORTED_FORMATS.get(os.path.splitext(name)[1].lower())
+
+
+def ingest_document(content: bytes, file_format: str) -> Dict:
+    """
+    Extract one document and derive everything later stages need from it.
+    Runs inside extraction worker processes.
+    """
+    document = extract_document(content, file_format)
+    return {
+        "text": document["text"],
+        "ocr_pages": document["ocr_pages"],
+        "ocr_errors": document["ocr_errors"],
+        "contacts": extract_contacts(document["text"]),
+        "timings": document["timings"],
+    }
+
+
+def ingest_files(files: Sequence[Tuple[str, bytes]], cache: Optional[EmbeddingCache] = None,
+                 workers: Optional[int] = None, timeout: Optional[float] = None,
+                 progress_callback: Optional[Callable[[int, int], None]] = None,
+                 formats: Optional[Sequence[Optional[str]]] = None,
+                 pool: Optional[ExtractionPool] = None) -> List[Dict]:
+    """
+    Extract every file once and return one record per file, keyed by content hash:
+    {"name", "content_hash", "format", "text", "ocr_pages", "ocr_errors", "contacts", "timings", "error"}
+    Text is cached with its OCR'd pages, and only when OCR had no errors,
+    so failed pages are retried on the next run.
+
+    The same record feeds both contact parsing (CV Parser) and scoring (AI
+    Evaluator). Text already in the cache is reused without re-opening the
+    file; only misses go to the extraction process pool.
+    :param formats: Optional 'pdf' / 'docx' per file, for callers that know
+        the format without a file extension
+    :param pool: ExtractionPool reused across calls of one run
+    """
+    records = []
+    misses = []
+    for i, (name, content) in enumerate(files):
+        file_format = formats[i] if formats is not None else file_format_for(name)
+        record = {
+            "name": name,
+            "content_hash": content_hash(content) if content else None,
+            "format": file_format,
+            "text": "",
+            "ocr_pages": [],
+            "ocr_errors": {},
+            "contacts": extract_contacts(""),
+            "timings": {},
+            "error": None,
+        }
+        if file_format is None:
+            record["error"] = "Unsupported file type"
+        elif cache is not None and record["content_hash"]:
+            cached = cache.get_document(record["content_hash"])
+            if cached is not None:
+                text, ocr_pages = cached
+                record.update(text=text, ocr_pages=ocr_pages, contacts=extract_contacts(text))
+            else:
+                misses.append(len(records))
+        else:
+            misses.append(len(records))
+        records.append(record)
+
+    outcomes = run_in_pool(
+        ingest_document,
+        [(files[i][1], records[i]["format"]) for i in misses],
+        workers=workers, timeout=timeout, progress_callback=progress_callback, pool=pool
+    )
+    for i, (document, error) in zip(misses, outcomes):
+        record = records[i]
+        if error is not None:
+            record["error"] = error
+            continue
+        record.update(document)
+        METRICS.observe_timings(record["timings"])
+        if cache is not None and record["content_hash"] and not record["ocr_errors"]:
+            cache.put_text(record["content_hash"], record["text"], record["ocr_pages"])
+
+    logger.info(f"✅ Ingested {len(records)} files ({len(records) - len(misses)} from cache)")
+    return records
+
+
+def ingest_paths(paths: Sequence[str], cache: Optional[EmbeddingCache] = None,
+                 workers: Optional[int] = None, timeout: Optional[float] = None,
+                 batch_files: int = 64) -> List[Dict]:
+    """
+    ingest_files for files on disk, read ``batch_files`` at a time so memory
+    stays bounded for large folders. Records carry the file name, not the path.
+    One extraction pool serves all batches.
+    """
+    records = []
+    with ExtractionPool(workers) as pool:
+        for start in range(0, len(paths), batch_files):
+            records.extend(_ingest_path_batch(paths[start:start + batch_files], cache, timeout, pool))
+    return records
+
+
+def _ingest_path_batch(paths: Sequence[str], cache: Optional[EmbeddingCache], timeout: Optional[float],
+                       pool: ExtractionPool) -> List[Dict]:
+    batch, unreadable = [], {}
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                batch.append((os.path.basename(path), f.read()))
+        except OSError as e:
+            unreadable[len(batch)] = str(e)
+            batch.append((os.path.basename(path), b""))
+    records = ingest_files(batch, cache=cache, timeout=timeout, pool=pool)
+    for i, error in unreadable.items():
+        records[i]["error"] = error
+    return records
@@ -0,0 +1,321 @@
+# jobs.py
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from resume_work.config import get_cache_directory
+from resume_work.ingest import file_format_for
+from resume_work.metrics import METRICS, Metrics
+from resume_work.results_store import SCORES, ResultsStore, display_scores
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+def analysis_to_row(analysis: Dict) -> Dict:
+    """
+    One AI Evaluator table row from a batch_analyze result. Scoring itself is
+    columnar (score_batch per chunk); rows stay per file because batch_analyze
+    streams results, and job progress and rows.jsonl advance file by file.
+    """
+    row = {
+        "Resume Name": analysis.get("name"),
+        **analysis.get("contacts", {}),
+        "Overall Match Score": float(analysis.get("overall_match_score") or 0.0),
+        "Keywords Matched": ", ".join(analysis.get("keywords_matched") or []),
+        "Semantic Relevance": float(analysis.get("semantic_relevance") or 0.0),
+        "Summary": analysis.get("summary") or "No summary available",
+        "Content Hash": analysis.get("content_hash"),
+        "OCR Pages": ", ".join(map(str, analysis.get("ocr_pages") or [])),
+    }
+    if analysis.get("Error"):
+        row["Error"] = analysis["Error"]
+    return row
+
+
+class ScoringJob:
+    """State of one submitted scoring run; persisted as job.json in its directory."""
+
+    FIELDS = ("id", "label", "job_description", "status", "total", "done",
+              "failed", "error", "created", "started", "finished", "metrics")
+
+    def __init__(self, directory: str, store: Optional[ResultsStore] = None, **state):
+        self.directory = directory
+        self.store = store
+        self.id: str = state.get("id") or uuid.uuid4().hex[:12]
+        self.label: str = state.get("label") or ""
+        self.job_description: str = state.get("job_description") or ""
+        self.status: str = state.get("status") or QUEUED
+        self.total: int = state.get("total") or 0
+        self.done: int = state.get("done") or 0
+        self.failed: int = state.get("failed") or 0
+        self.error: Optional[str] = state.get("error")
+        self.created: float = state.get("created") or time.time()
+        self.started: Optional[float] = state.get("started")
+        self.finished: Optional[float] = state.get("finished")
+        self.rows: List[Dict] = []
+        self.cancel_requested = False
+        self.run_metrics = Metrics()
+        self._metrics_summary: Dict = state.get("metrics") or {}
+
+    @property
+    def metrics(self) -> Dict:
+        """Per-stage timing summary of this run (live while it is running)."""
+        return self.run_metrics.summary() or self._metrics_summary
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, self.id)
+
+    @property
+    def inputs_dir(self) -> str:
+        return os.path.join(self.path, "inputs")
+
+    @property
+    def rows_path(self) -> str:
+        # Rows scored so far, one JSON object per line, in input order
+        return os.path.join(self.path, "rows.jsonl")
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 0.0
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def save(self):
+        tmp_path = os.path.join(self.path, "job.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, os.path.join(self.path, "job.json"))
+
+    def results_frame(self) -> pd.DataFrame:
+        """
+        Result table: the rows so far for running jobs; for finished ones the
+        stored Parquet run (or results.json of jobs stored before the store).
+        """
+        if self.store is not None and self.status in FINISHED and not self.rows:
+            if self.store.has_run(SCORES, self.id):
+                return display_scores(self.store.read_scores(self.id))
+        return pd.DataFrame(self.load_results())
+
+    def load_results(self) -> List[Dict]:
+        """
+        Rows so far for running jobs; the persisted result rows for finished
+        ones (the results store, else the incremental rows file if storing failed).
+        """
+        if self.rows or self.status not in FINISHED:
+            return list(self.rows)
+        if self.store is not None and self.store.has_run(SCORES, self.id):
+            df = display_scores(self.store.read_scores(self.id)).astype(object)
+            self.rows = df.where(df.notna(), None).to_dict("records")
+            return list(self.rows)
+        if os.path.exists(self.rows_path):
+            self.rows = self.load_partial_rows()
+            return list(self.rows)
+        try:
+            with open(os.path.join(self.path, "results.json"), "r", encoding="utf-8") as f:
+                self.rows = json.load(f)
+        except (OSError, ValueError):
+            self.rows = []
+        return list(self.rows)
+
+    def append_rows(self, rows: List[Dict]):
+        """Persist scored rows as they arrive so a crash only loses the current file."""
+        with open(self.rows_path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+            f.flush()
+
+    def load_partial_rows(self) -> List[Dict]:
+        """Rows persisted by append_rows; a torn last line from a crash is dropped."""
+        rows = []
+        try:
+            with open(self.rows_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return rows
+
+    def input_files(self, skip: int = 0) -> Iterator[Tuple[bytes, Optional[str], str]]:
+        """
+        Spooled uploads as batch_analyze items, read one at a time.
+        :param skip: Number of leading inputs to leave out (already scored)
+        """
+        for entry in sorted(os.listdir(self.inputs_dir))[skip:]:
+            name = entry.split("_", 1)[1]
+            with open(os.path.join(self.inputs_dir, entry), "rb") as f:
+                content = f.read()
+            yield content, file_format_for(name), name
+
+
+class JobRunner:
+    """
+    Runs scoring jobs on background threads, independent of the Streamlit
+    script run that submitted them.
+
+    Uploads are spooled to disk on submit, so a job keeps going when the page
+    reruns and holds no file content in memory while queued. Progress and
+    result rows are visible while a job runs; job state and results are
+    written under the cache directory and reloaded on restart, where jobs that
+    had not finished are queued again. Finished results go to the Parquet
+    results store, one run per job, with the resume embeddings from the index.
+    """
+
+    def __init__(self, analyzer, index=None, directory: Optional[str] = None, workers: Optional[int] = None,
+                 store: Optional[ResultsStore] = None):
+        self.analyzer = analyzer
+        self.index = index
+        self.store = store or ResultsStore()
+        self.directory = directory or os.path.join(get_cache_directory(), "jobs")
+        os.makedirs(self.directory, exist_ok=True)
+        workers = workers or int(os.environ.get("CV_SCANNER_JOB_WORKERS", "1"))
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="scoring-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ScoringJob] = {}
+        self._load_jobs()
+
+    def submit(self, job_description: str, files: Iterable[Tuple[str, bytes]], label: str = "") -> ScoringJob:
+        """
+        Queue a scoring job.
+        :param files: (file name, content) pairs; written to disk one at a time
+        :return: The queued job; poll get() with its id for progress
+        """
+        job = ScoringJob(self.directory, store=self.store, label=label, job_description=job_description)
+        os.makedirs(job.inputs_dir)
+        for i, (name, content) in enumerate(files):
+            with open(os.path.join(job.inputs_dir, f"{i:06d}_{os.path.basename(name)}"), "wb") as f:
+                f.write(content)
+            job.total += 1
+        job.save()
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        logger.info(f"✅ Queued scoring job {job.id} ({job.total} files)")
+        return job
+
+    def get(self, job_id: str) -> Optional[ScoringJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[ScoringJob]:
+        """All known jobs, newest first."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: -job.created)
+
+    def cancel(self, job_id: str):
+        job = self.get(job_id)
+        if job is not None and job.status not in FINISHED:
+            job.cancel_requested = True
+
+    def delete(self, job_id: str):
+        """Forget a finished job and remove its stored results."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in FINISHED:
+                return
+            del self._jobs[job_id]
+        shutil.rmtree(job.path, ignore_errors=True)
+        self.store.delete_run(SCORES, job_id)
+
+    def _run(self, job: ScoringJob):
+        if job.cancel_requested:
+            self._finish(job, CANCELLED)
+            return
+        job.status, job.started = RUNNING, time.time()
+        # A job interrupted by a restart resumes after the rows it had persisted
+        job.rows = job.load_partial_rows()
+        with open(job.rows_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row) + "\n" for row in job.rows)
+        job.done, job.failed = len(job.rows), sum("Error" in row for row in job.rows)
+        job.run_metrics.reset()
+        job.save()
+        if job.rows:
+            logger.info(f"✅ Resuming scoring job {job.id} after {job.done} scored files")
+        try:
+            prepared_job = self.analyzer.prepare_job(job.job_description)
+            results = self.analyzer.batch_analyze(job.input_files(skip=job.done), prepared_job, index=self.index)
+            try:
+                for analysis in results:
+                    job.run_metrics.observe_timings(analysis.get("timings"))
+                    row = analysis_to_row(analysis)
+                    job.append_rows([row])
+                    job.rows.append(row)
+                    job.failed += "Error" in row
+                    job.done += 1
+                    if job.cancel_requested:
+                        self._finish(job, CANCELLED)
+                        return
+            finally:
+                results.close()
+        except Exception as e:
+            logger.error(f"❌ Scoring job {job.id} failed: {e}")
+            job.error = str(e)
+            self._finish(job, FAILED)
+            return
+        self._finish(job, DONE)
+
+    def _finish(self, job: ScoringJob, status: str):
+        job.status, job.finished = status, time.time()
+        try:
+            self._store_results(job)
+        except Exception as e:
+            # The rows stay in rows.jsonl, where load_results still finds them
+            logger.error(f"❌ Could not store results of scoring job {job.id}: {e}")
+            job.status = FAILED
+            job.error = "; ".join(filter(None, [job.error, f"Could not store results: {e}"]))
+        else:
+            try:
+                os.remove(job.rows_path)
+            except OSError:
+                pass
+        finally:
+            job.save()
+        shutil.rmtree(job.inputs_dir, ignore_errors=True)
+        try:
+            METRICS.write()
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write metrics file: {e}")
+        logger.info(f"✅ Scoring job {job.id} {status}: {job.done}/{job.total} files")
+
+    def _store_results(self, job: ScoringJob):
+        embeddings = None
+        if self.index is not None:
+            try:
+                embeddings = self.index.get([row["Content Hash"] for row in job.rows if row.get("Content Hash")])
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read embeddings for job {job.id}: {e}")
+        self.store.write_scores(job.rows, run_id=job.id, embeddings=embeddings, meta={
+            "label": job.label, "job_description": job.job_description, "status": job.status,
+        })
+
+    def _load_jobs(self):
+        for entry in os.listdir(self.directory):
+            try:
+                with open(os.path.join(self.directory, entry, "job.json"), "r", encoding="utf-8") as f:
+                    job = ScoringJob(self.directory, store=self.store, **json.load(f))
+            except (OSError, ValueError):
+                continue
+            self._jobs[job.id] = job
+            if job.status not in FINISHED:
+                if os.path.isdir(job.inputs_dir):
+                    job.status = QUEUED
+                    job.save()
+                    self._executor.submit(self._run, job)
+                else:
+                    job.error = "Inputs lost before the job finished"
+                    self._finish(job, FAILED)
@@ -0,0 +1,91 @@
+# keyword_matcher.py
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+# A keyword must not be glued to other word characters: "Java" does not
+# match inside "JavaScript" and "AI" does not match inside "maintain".
+# '+' and '#' count as word characters on the right so "C" skips "C++".
+_LEFT_BOUNDARY = r"(?<![a-z0-9_])"
+_RIGHT_BOUNDARY = r"(?![a-z0-9_+#])"
+
+
+def _char_pattern(ch: str) -> str:
+    return r"\s+" if ch == " " else re.escape(ch)
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Build one alternation regex from a character trie of the terms, so
+    shared prefixes are tested once and matching cost does not grow with
+    the number of terms.
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [_char_pattern(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A complete term ends here but longer terms continue: try the
+            # longer ones first and fall back to the shorter one.
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Matches a fixed set of keywords against free text in one regex pass.
+    Built once per job description and reused for every resume.
+    """
+
+    def __init__(self, keywords: Iterable[str], aliases: Optional[Dict[str, str]] = None):
+        """
+        :param keywords: Canonical keywords to report
+        :param aliases: Optional extra surface forms mapped to a canonical keyword
+        """
+        self.keywords: List[str] = []
+        self._canonical: Dict[str, str] = {}
+        for keyword in keywords:
+            needle = self.normalize(keyword)
+            if needle and needle not in self._canonical:
+                self._canonical[needle] = keyword
+                self.keywords.append(keyword)
+        known = set(self.keywords)
+        for alias, keyword in (aliases or {}).items():
+            needle = self.normalize(alias)
+            if needle and keyword in known:
+                self._canonical.setdefault(needle, keyword)
+
+        self._pattern = None
+        if self._canonical:
+            self._pattern = re.compile(
+                _LEFT_BOUNDARY + "(" + _trie_pattern(self._canonical) + ")" + _RIGHT_BOUNDARY
+            )
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase and collapse whitespace, keeping punctuation such as C++ or Node.js."""
+        return " ".join(text.lower().split())
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Occurrences of each matched canonical keyword in the text."""
+        if self._pattern is None or not text:
+            return {}
+        counts = Counter()
+        for match in self._pattern.finditer(text.lower()):
+            counts[self._canonical[" ".join(match.group(1).split())]] += 1
+        return dict(counts)
+
+    def match(self, text: str) -> List[str]:
+        """Matched canonical keywords, in keyword order."""
+        counts = self.count(text)
+        return [kw for kw in self.keywords if kw in counts]
@@ -0,0 +1,145 @@
+# metrics.py
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Union
+
+from resume_work.config import get_cache_directory
+
+# Pipeline stages timed per document ("ocr_page" is per page, "merge" per run)
+STAGES = ("read", "pdf_text", "ocr_page", "docx", "preprocess", "encode",
+          "similarity", "keyword_match", "merge")
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Timings = Dict[str, Union[float, List[float]]]
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Bucket upper bound below which a fraction q of observations fall."""
+        rank, seen = q * self.count, 0
+        for bound, count in zip(BUCKETS + (self.max,), self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """
+    Thread-safe per-stage timing histograms.
+
+    Stages observe one duration per document (per page for OCR). Timings
+    measured inside extraction worker processes travel back with the results
+    as a ``timings`` dict and are recorded in the parent with observe_timings().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Histogram] = {}
+        self.started = time.time()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = _Histogram()
+            histogram.observe(seconds)
+
+    def observe_timings(self, timings: Optional[Timings]):
+        """Record a per-document timings dict; list values are one observation each."""
+        for stage, value in (timings or {}).items():
+            for seconds in (value if isinstance(value, list) else [value]):
+                self.observe(stage, seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self.started = time.time()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-stage aggregates in STAGES order:
+        {stage: {"count", "total_s", "mean_ms", "p50_ms", "p95_ms", "max_ms"}}
+        (percentiles are bucket upper bounds).
+        """
+        with self._lock:
+            stages = sorted(self._stages.items(),
+                            key=lambda item: STAGES.index(item[0]) if item[0] in STAGES else len(STAGES))
+            return {
+                stage: {
+                    "count": h.count,
+                    "total_s": h.total,
+                    "mean_ms": h.total / h.count * 1000 if h.count else 0.0,
+                    "p50_ms": h.quantile(0.5) * 1000,
+                    "p95_ms": h.quantile(0.95) * 1000,
+                    "max_ms": h.max * 1000,
+                }
+                for stage, h in stages
+            }
+
+    def to_prometheus(self, prefix: str = "cv_scanner") -> str:
+        """Prometheus text exposition format (one histogram labelled by stage)."""
+        name = f"{prefix}_stage_duration_seconds"
+        lines = [f"# HELP {name} Time spent per document (per page for ocr_page) in each pipeline stage.",
+                 f"# TYPE {name} histogram"]
+        with self._lock:
+            for stage, h in sorted(self._stages.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS, h.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.total:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+        lines.append(f"# HELP {prefix}_metrics_start_time_seconds When these metrics started accumulating.")
+        lines.append(f"# TYPE {prefix}_metrics_start_time_seconds gauge")
+        lines.append(f"{prefix}_metrics_start_time_seconds {self.started:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Optional[str] = None) -> str:
+        """
+        Atomically write the Prometheus text to ``path`` (default: metrics.prom
+        in the cache directory, or CV_SCANNER_METRICS_FILE), e.g. for the
+        node_exporter textfile collector.
+        """
+        path = path or default_metrics_file()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+        return path
+
+
+def default_metrics_file() -> str:
+    return os.environ.get("CV_SCANNER_METRICS_FILE") or os.path.join(get_cache_directory(), "metrics.prom")
+
+
+# Process-wide registry used by the pipeline
+METRICS = Metrics()
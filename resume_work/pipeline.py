@@ -0,0 +1,104 @@
+# pipeline.py
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Group any iterable into lists of at most ``size`` items, lazily."""
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the pipeline is being torn down."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def _feed(source: Iterable, out_q: queue.Queue, stop: threading.Event):
+    try:
+        for item in source:
+            if not _put(out_q, item, stop):
+                return
+        _put(out_q, _DONE, stop)
+    except BaseException as e:
+        _put(out_q, _StageError(e), stop)
+
+
+def _work(func: Callable, in_q: queue.Queue, out_q: queue.Queue, stop: threading.Event):
+    while True:
+        item = _get(in_q, stop)
+        if item is _DONE or isinstance(item, _StageError):
+            _put(out_q, item, stop)
+            return
+        try:
+            result = func(item)
+        except BaseException as e:
+            _put(out_q, _StageError(e), stop)
+            return
+        if not _put(out_q, result, stop):
+            return
+
+
+def run_stages(source: Iterable, stages: Sequence[Callable], queue_size: int = 2) -> Iterator:
+    """
+    Run ``source`` through ``stages`` (one thread each, in order) and yield the
+    output of the last stage.
+
+    Stages are connected by queues holding at most ``queue_size`` items, so a
+    slow stage applies back-pressure upstream instead of letting items pile up
+    in memory. The first exception raised by the source or a stage is re-raised
+    in the caller; closing the generator early stops all stages.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in range(len(stages) + 1)]
+    threads = [threading.Thread(target=_feed, args=(source, queues[0], stop), daemon=True)]
+    for i, func in enumerate(stages):
+        threads.append(threading.Thread(target=_work, args=(func, queues[i], queues[i + 1], stop), daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = _get(queues[-1], stop)
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1.0)
@@ -0,0 +1,256 @@
+# results_store.py
+import glob
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from resume_work.config import get_cache_directory
+
+logger = logging.getLogger(__name__)
+
+PARSED, SCORES = "parsed", "scores"
+CONTACT_COLUMNS = ("Name", "Email", "Phone", "LinkedIn", "GitHub")
+
+# Typed columns of each dataset; rows are written as produced by
+# ResumeParser.parse_pdfs and jobs.analysis_to_row respectively
+_TEXT = pa.string()
+PARSED_SCHEMA = pa.schema(
+    [("Run ID", _TEXT)]
+    + [(column, _TEXT) for column in CONTACT_COLUMNS]
+    + [("FileName", _TEXT), ("ContentHash", _TEXT)]
+)
+SCORES_SCHEMA = pa.schema(
+    [("Run ID", _TEXT), ("Resume Name", _TEXT), ("Content Hash", _TEXT)]
+    + [(column, _TEXT) for column in CONTACT_COLUMNS]
+    + [
+        ("Overall Match Score", pa.float64()),
+        ("Semantic Relevance", pa.float64()),
+        ("Keywords Matched", pa.list_(_TEXT)),
+        ("Summary", pa.dictionary(pa.int8(), _TEXT)),
+        ("OCR Pages", pa.list_(pa.int32())),
+        ("Error", _TEXT),
+    ]
+)
+_SCHEMAS = {PARSED: PARSED_SCHEMA, SCORES: SCORES_SCHEMA}
+RANKED_COLUMNS = (
+    "Rank", "Name", "Phone", "Email", "LinkedIn", "GitHub",
+    "Overall Match Score", "Keywords Matched", "Semantic Relevance", "Resume Name",
+)
+_META_KEY = b"cv_scanner"
+
+
+def _split_list(value, cast=str) -> List:
+    """Typed list from a list or a ", "-joined string, as produced by analysis_to_row."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    if isinstance(value, str):
+        return [cast(item.strip()) for item in value.split(",") if item.strip()]
+    return [cast(item) for item in value]
+
+
+def display_scores(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Stored scores in the AI Evaluator table layout: list columns joined with
+    ", " as in jobs.analysis_to_row, and no run id or embeddings.
+    """
+    df = df.drop(columns=["Run ID", "Embedding"], errors="ignore")
+    if "Keywords Matched" in df.columns:
+        df["Keywords Matched"] = df["Keywords Matched"].map(", ".join)
+    if "OCR Pages" in df.columns:
+        df["OCR Pages"] = df["OCR Pages"].map(lambda pages: ", ".join(map(str, pages)))
+    return df
+
+
+def ordinal_ranks(count: int) -> np.ndarray:
+    """Rank labels "1st", "2nd", "3rd", "4th", ... for ``count`` rows best first."""
+    suffixes = np.full(count, "th", dtype=object)
+    suffixes[:3] = ["st", "nd", "rd"][:count]
+    return np.arange(1, count + 1).astype(str).astype(object) + suffixes
+
+
+def ranked_view(scores: pd.DataFrame, parsed: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Final Ranked Results table: scored resumes best first with a Rank column.
+    Failed files are dropped, and contacts the scoring pass did not find are
+    filled from the CV Parser records with the same content hash.
+    :param scores: AI Evaluator rows (display_scores layout)
+    :param parsed: Optional CV Parser records with a "ContentHash" column
+    """
+    if "Error" in scores.columns:
+        scores = scores[scores["Error"].isna()]
+    scores = scores.reset_index(drop=True)
+
+    contacts = None
+    if parsed is not None and not parsed.empty and "Content Hash" in scores.columns:
+        contacts = (parsed.drop_duplicates("ContentHash", keep="last").set_index("ContentHash")
+                    .reindex(scores["Content Hash"]).reset_index(drop=True))
+    for column in CONTACT_COLUMNS:
+        if column in scores.columns:
+            values = scores[column].astype(object)
+        else:
+            values = pd.Series(None, index=scores.index, dtype=object)
+        if contacts is not None and column in contacts.columns:
+            found = contacts[column].notna() & ~contacts[column].isin(["", "Unknown"])
+            missing = values.isna() | values.isin(["", "Unknown"])
+            values = values.mask(missing & found, contacts[column])
+        scores[column] = values.fillna("Not available")
+
+    scores["Overall Match Score"] = pd.to_numeric(scores["Overall Match Score"], errors="coerce").fillna(0.0)
+    ranked = scores.sort_values("Overall Match Score", ascending=False, kind="stable").reset_index(drop=True)
+    ranked["Rank"] = ordinal_ranks(len(ranked))
+    return ranked[[column for column in RANKED_COLUMNS if column in ranked.columns]]
+
+
+class ResultsStore:
+    """
+    Append-only Parquet store of CV Parser and AI Evaluator results.
+
+    Every run (a parse of the save folder, or a scoring job) is written once,
+    as its own Parquet file under <directory>/<kind>/, with typed columns:
+    contacts as strings, scores as float64, matched keywords and OCR pages as
+    lists, and optionally the resume embeddings as a fixed-size float32 list.
+    Run metadata lives in the file footer, so listing runs reads no row data,
+    and reads can select columns and push filters down to the row groups.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(get_cache_directory(), "results")
+        for kind in _SCHEMAS:
+            os.makedirs(os.path.join(self.directory, kind), exist_ok=True)
+
+    def write_parsed(self, records: Sequence[Dict], run_id: Optional[str] = None,
+                     meta: Optional[Dict] = None) -> str:
+        """
+        Store one CV Parser run.
+        :param records: ResumeParser.data records
+        :return: The run id
+        """
+        return self._write(PARSED, records, run_id, meta)
+
+    def write_scores(self, rows: Sequence[Dict], run_id: Optional[str] = None, meta: Optional[Dict] = None,
+                     embeddings: Optional[Dict[str, np.ndarray]] = None) -> str:
+        """
+        Store one scoring run.
+        :param rows: AI Evaluator rows (jobs.analysis_to_row)
+        :param embeddings: Optional {content hash: L2-normalised vector}; stored
+            in an "Embedding" column, null for rows without one
+        :return: The run id
+        """
+        return self._write(SCORES, rows, run_id, meta, embeddings)
+
+    def runs(self, kind: str) -> List[Dict]:
+        """Stored runs of a kind, newest first: [{"run_id", "created", "rows", **meta}]."""
+        runs = []
+        for path in self._paths(kind):
+            try:
+                parquet = pq.ParquetFile(path)
+                info = json.loads(parquet.schema_arrow.metadata[_META_KEY])
+            except (OSError, KeyError, TypeError, ValueError, pa.ArrowException):
+                continue
+            runs.append({**info, "rows": parquet.metadata.num_rows})
+        return sorted(runs, key=lambda run: -run["created"])
+
+    def has_run(self, kind: str, run_id: str) -> bool:
+        return bool(self._run_paths(kind, run_id))
+
+    def latest_run(self, kind: str) -> Optional[Dict]:
+        runs = self.runs(kind)
+        return runs[0] if runs else None
+
+    def read_parsed(self, run_id: Optional[str] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Records of one CV Parser run (default: the latest)."""
+        return self._read(PARSED, run_id, columns)
+
+    def read_scores(self, run_id: Optional[str] = None, columns: Optional[List[str]] = None,
+                    min_score: Optional[float] = None, include_errors: bool = True) -> pd.DataFrame:
+        """
+        Rows of one scoring run (default: the latest).
+        :param columns: Subset of columns to read ("Run ID" and "Embedding" are only read when requested)
+        :param min_score: Keep rows with an Overall Match Score of at least this
+        :param include_errors: False drops files that could not be scored
+        """
+        condition = None
+        if min_score is not None:
+            condition = pc.field("Overall Match Score") >= min_score
+        if not include_errors:
+            no_error = pc.field("Error").is_null()
+            condition = no_error if condition is None else condition & no_error
+        return self._read(SCORES, run_id, columns, condition)
+
+    def delete_run(self, kind: str, run_id: str):
+        for path in self._run_paths(kind, run_id):
+            os.remove(path)
+
+    def _paths(self, kind: str) -> List[str]:
+        return glob.glob(os.path.join(self.directory, kind, "*.parquet"))
+
+    def _run_paths(self, kind: str, run_id: str) -> List[str]:
+        return glob.glob(os.path.join(self.directory, kind, f"*-{run_id}.parquet"))
+
+    def _write(self, kind: str, rows: Sequence[Dict], run_id: Optional[str], meta: Optional[Dict],
+               embeddings: Optional[Dict[str, np.ndarray]] = None) -> str:
+        run_id = run_id or uuid.uuid4().hex[:12]
+        created = time.time()
+        schema = _SCHEMAS[kind]
+        columns = {}
+        for field in schema:
+            if field.name == "Run ID":
+                values = [run_id] * len(rows)
+            elif pa.types.is_list(field.type):
+                cast = int if pa.types.is_integer(field.type.value_type) else str
+                values = [_split_list(row.get(field.name), cast) for row in rows]
+            elif pa.types.is_floating(field.type):
+                values = pd.to_numeric(pd.Series([row.get(field.name) for row in rows], dtype=object),
+                                       errors="coerce").to_numpy(dtype=np.float64)
+            else:
+                values = [None if row.get(field.name) is None else str(row[field.name]) for row in rows]
+            if pa.types.is_dictionary(field.type):
+                columns[field.name] = pa.array(values, type=_TEXT).dictionary_encode()
+            else:
+                columns[field.name] = pa.array(values, type=field.type, from_pandas=True)
+
+        if embeddings:
+            dim = len(next(iter(embeddings.values())))
+            vectors = [embeddings.get(row.get("Content Hash")) for row in rows]
+            columns["Embedding"] = pa.array(
+                [None if v is None else np.asarray(v, dtype=np.float32) for v in vectors],
+                type=pa.list_(pa.float32(), dim)
+            )
+
+        info = {"run_id": run_id, "kind": kind, "created": created, **(meta or {})}
+        table = pa.table(columns).replace_schema_metadata({_META_KEY: json.dumps(info).encode("utf-8")})
+
+        previous = self._run_paths(kind, run_id)
+        path = os.path.join(self.directory, kind, f"{int(created * 1000):013d}-{run_id}.parquet")
+        tmp_path = path + ".tmp"
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        for old_path in previous:
+            os.remove(old_path)  # a re-run of the same job replaces its earlier file
+        logger.info(f"✅ Stored {len(rows)} {kind} rows (run {run_id})")
+        return run_id
+
+    def _read(self, kind: str, run_id: Optional[str], columns: Optional[List[str]],
+              filters: Optional[pc.Expression] = None) -> pd.DataFrame:
+        if run_id is None:
+            latest = self.latest_run(kind)
+            run_id = latest["run_id"] if latest else None
+        paths = self._run_paths(kind, run_id) if run_id else []
+        if not paths:
+            return pd.DataFrame(columns=columns or [n for n in _SCHEMAS[kind].names if n != "Run ID"])
+        if columns is None:
+            columns = [name for name in pq.read_schema(paths[0]).names if name not in ("Run ID", "Embedding")]
+        table = pq.read_table(paths[0], columns=columns, filters=filters)
+        df = table.to_pandas()
+        if "Summary" in df.columns:
+            df["Summary"] = df["Summary"].astype(object)
+        return df
@@ -1,6 +1,6 @@
+import hashlib
+import json
 import os
-import fitz  # PyMuPDF
-import re
 import sys
 from pathlib import Path
 import pandas as pd
@@ -8,6 +8,7 @@ import pandas as pd
 # --- 🔧 Fix: Add current directory to path so 'config.py' is importable ---
 current_dir = Path(__file__).parent
 sys.path.append(str(current_dir))
+sys.path.append(str(current_dir.parent))  # so 'resume_work.*' resolves when run as a script
 
 try:
     from config import get_save_directory
@@ -18,116 +19,120 @@ except ImportError as e:
         return str(current_dir.parent / "uploads" / "resumes")
     print(f"⚠️ Could not import config: {e}")
 
+from resume_work.contact_extraction import normalize_phone
+from resume_work.ingest import ingest_paths
+from resume_work.text_extraction import extract_pdf_file_text
+
+# Bump when the candidate record format changes so incremental runs re-parse every file
+MANIFEST_VERSION = 3
+
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 # --- Resume Parser Class ---
 
 
 class ResumeParser:
     
-    def __init__(self, save_dir=None, output_file="candidates.csv"):
+    def __init__(self, save_dir=None, output_file="candidates.csv", cache=None):
+        """
+        :param cache: Optional EmbeddingCache; extracted text is shared through
+            it with the AI Evaluator, so each file is only extracted once
+        """
         self.save_dir = save_dir or get_save_directory()
         self.excel_file = os.path.join(self.save_dir, output_file)
+        self.cache = cache
         self.data = []
 
     def extract_text_from_pdf(self, file_path):
-        doc = fitz.open(file_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        return text
+        return extract_pdf_file_text(file_path)
 
     def normalize_phone(self, num):
-        digits = re.sub(r'\D', '', num)
-        if digits.startswith("977") and len(digits) == 13:
-            return "+977" + digits[3:]
-        elif len(digits) == 10:
-            return digits
-        return None
-
-    def parse_pdfs(self):
+        return normalize_phone(num)
+
+    def parse_pdfs(self, workers=None, timeout=None, incremental=True):
+        """
+        Parse every PDF in save_dir. Files go through the shared ingest stage
+        (resume_work.ingest), fanned out across a process pool (``workers``
+        defaults to the CPU count). Records carry the file's ContentHash.
+
+        With ``incremental=True`` a manifest (path, size, mtime, content hash
+        and parsed record) is kept next to the output file: only new or
+        changed PDFs are parsed, deleted ones are dropped, and the rest are
+        merged back from the manifest.
+        """
         self.data = []  # Reset data to avoid duplication on multiple calls
-        
-        def extract_emails(text):
-            return re.findall(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+', text)
-
-
-        def extract_linkedin(text):
-            # Match URL
-            url_match = re.search(r'https?://(?:www\.)?linkedin\.com/in/[\w-]+', text, re.IGNORECASE)
-            if url_match:
-                url = url_match.group(0)
-                return url if url.startswith("http") else f"https://{url}"
-
-            # Match partial
-            partial_match = re.search(r'linkedin\.com/in/[\w-]+', text, re.IGNORECASE)
-            if partial_match:
-                return f"https://{partial_match.group(0)}"
-
-            # Match "LinkedIn: username"
-            handle_match = re.search(r'linkedin[^\w]*[:\s][^\w]*([\w-]{5,})', text, re.IGNORECASE)
-            if handle_match:
-                return f"https://linkedin.com/in/{handle_match.group(1).strip()}"
-            return ""
-        
-
-        def extract_github(text):
-            url_match = re.search(r'https?://(?:www\.)?github\.com/[\w-]+', text, re.IGNORECASE)
-            if url_match:
-                url = url_match.group(0)
-                return url if url.startswith("http") else f"https://{url}"
-
-            partial_match = re.search(r'github\.com/[\w-]+', text, re.IGNORECASE)
-            if partial_match:
-                return f"https://{partial_match.group(0)}"
-
-            handle_match = re.search(r'git(?:hub)?[^\w]*[:\s][^\w]*([\w-]{3,})', text, re.IGNORECASE)
-            if handle_match:
-                return f"https://github.com/{handle_match.group(1).strip()}"
-            return ""
-        
-        for filename in os.listdir(self.save_dir):
-            if filename.lower().endswith(".pdf"):
-                file_path = os.path.join(self.save_dir, filename)
-                try:
-                    text = self.extract_text_from_pdf(file_path)
-
-                    # Extract Email
-                    # emails = re.findall(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+', text)
-
-                    # Extract Phone
-                    phone_raw = re.findall(r'(\+?977\d{10}|\b\d{10}\b)', text)
-                    phones = [self.normalize_phone(p) for p in phone_raw if self.normalize_phone(p)]
-                    linkedin = extract_linkedin(text) or "Unknown"
-                    github = extract_github(text) or "Unknown"
-                    email = extract_emails(text) or "Unknown"
-
-                    # Extract Name
-                    name = None
-                    for line in text.splitlines():
-                        if 'name' in line.lower():
-                            name = line.split(":")[-1].strip()
-                            break
-                    if not name:
-                        for line in text.splitlines():
-                            if line.strip():
-                                name = line.strip()
-                                break
-
-
-                    self.data.append({
-                        "Name": name or "Unknown",
-                        # "Email": ','.join(emails),
-                        "Email" : ',  '.join(email),
-                        "Phone": ',  '.join(phones),
-                        "LinkedIn" : linkedin,
-                        "GitHub" : github,
-                        "FileName": filename
-
-                    })
-                except Exception as e:
-                    print(f"❌ Error processing {filename}: {e}")
 
+        filenames = sorted(f for f in os.listdir(self.save_dir) if f.lower().endswith(".pdf"))
+        manifest = self.load_manifest() if incremental else {}
+        entries = {}
+        to_parse = []
+        for filename in filenames:
+            file_path = os.path.join(self.save_dir, filename)
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                print(f"❌ Error processing {filename}: {e}")
+                continue
+            entry = {"path": file_path, "size": stat.st_size, "mtime": stat.st_mtime}
+            previous = manifest.get(filename)
+            if previous and previous.get("record") is not None:
+                if previous["size"] == entry["size"] and previous["mtime"] == entry["mtime"]:
+                    entries[filename] = previous
+                    continue
+                # Touched but possibly identical (e.g. re-downloaded): compare content
+                entry["sha256"] = file_sha256(file_path)
+                if entry["sha256"] == previous.get("sha256"):
+                    entries[filename] = {**previous, **entry}
+                    continue
+            to_parse.append((filename, entry))
+
+        ingested = ingest_paths(
+            [entry["path"] for _, entry in to_parse], cache=self.cache, workers=workers, timeout=timeout
+        )
+        parsed = 0
+        for (filename, entry), item in zip(to_parse, ingested):
+            if item["error"] is not None:
+                print(f"❌ Error processing {filename}: {item['error']}")
+                continue
+            entry["sha256"] = item["content_hash"]
+            entry["record"] = {**item["contacts"], "FileName": filename, "ContentHash": item["content_hash"]}
+            entries[filename] = entry
+            parsed += 1
+
+        self.data = [entries[f]["record"] for f in filenames if f in entries]
+        removed = len(set(manifest) - set(filenames))
+        if incremental:
+            self.save_manifest(entries)
+            print(f"📄 Parsed {parsed} new/changed, kept {len(self.data) - parsed}, "
+                  f"dropped {removed} deleted resume(s).")
         print(f"📄 Parsed {len(self.data)} resumes.")
 
+    @property
+    def manifest_file(self):
+        return os.path.splitext(self.excel_file)[0] + ".manifest.json"
+
+    def load_manifest(self):
+        """Previously parsed files keyed by filename; empty if missing or outdated."""
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("files", {})
+
+    def save_manifest(self, entries):
+        tmp_path = self.manifest_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": entries}, f)
+        os.replace(tmp_path, self.manifest_file)
 
     def display_data(self):
         """Display parsed data in terminal."""
@@ -157,6 +162,18 @@ class ResumeParser:
         else:
             raise ValueError(f"Unsupported file extension: {ext}. Use .csv or .xlsx")    
 
+    def save_to_store(self, store=None, run_id=None):
+        """
+        Store the parsed records as one run of the Parquet results store.
+        :return: The run id, or None if there is nothing to store
+        """
+        if not self.data:
+            print("⚠️ No data to save.")
+            return None
+        from resume_work.results_store import ResultsStore
+        store = store or ResultsStore()
+        return store.write_parsed(self.data, run_id=run_id, meta={"save_dir": str(self.save_dir)})
+
 
 # --------------------------------------------------
 # This block runs only when script is executed directly
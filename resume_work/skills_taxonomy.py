@@ -0,0 +1,77 @@
+# skills_taxonomy.py
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from resume_work.keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SKILLS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills_taxonomy.json")
+
+
+class SkillsTaxonomy:
+    """
+    Canonical skills and their aliases ("k8s" -> Kubernetes), compiled into a
+    single KeywordMatcher so a text is scanned once for every skill.
+
+    The bundled skills_taxonomy.json is a starter set of a few hundred common
+    tech and soft skills, not a full taxonomy. Aliases only name the same
+    skill (never a broader stack or practice). Pass a larger file to load(),
+    or set CV_SCANNER_SKILLS_FILE, for wider coverage.
+
+    Taxonomy files are JSON: {"version": 1, "skills": {"Kubernetes": ["k8s", "kube"], ...}}
+    """
+
+    def __init__(self, skills: Dict[str, List[str]]):
+        self.skills: List[str] = list(skills)
+        self.aliases: Dict[str, str] = {}
+        for name, aliases in skills.items():
+            for alias in aliases:
+                self.aliases.setdefault(alias, name)
+        self.matcher = KeywordMatcher(self.skills, aliases=self.aliases)
+
+    def __len__(self):
+        return len(self.skills)
+
+    def find(self, text: str) -> Dict[str, int]:
+        """Canonical skills mentioned in the text, with occurrence counts."""
+        return self.matcher.count(text)
+
+    def aliases_for(self, names: Iterable[str]) -> Dict[str, str]:
+        """Alias -> canonical name, restricted to the given skills."""
+        wanted = set(names)
+        return {alias: name for alias, name in self.aliases.items() if name in wanted}
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillsTaxonomy":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("skills", {}))
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "SkillsTaxonomy":
+        """
+        Load a taxonomy file, reusing the taxonomy already built in this
+        process while the file is unchanged (same size and mtime).
+        Compiling the bundled file takes a few tens of milliseconds, so no
+        on-disk index is kept.
+        """
+        path = os.path.abspath(path or os.environ.get("CV_SCANNER_SKILLS_FILE") or DEFAULT_SKILLS_FILE)
+        stat = os.stat(path)
+        return _load_taxonomy(path, stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _load_taxonomy(path: str, size: int, mtime_ns: int) -> SkillsTaxonomy:
+    taxonomy = SkillsTaxonomy.from_file(path)
+    logger.info(f"✅ Loaded skills taxonomy: {len(taxonomy)} skills, {len(taxonomy.aliases)} aliases")
+    return taxonomy
+
+
+@lru_cache(maxsize=1)
+def load_default_taxonomy() -> SkillsTaxonomy:
+    """Process-wide taxonomy loaded from CV_SCANNER_SKILLS_FILE or the bundled file."""
+    return SkillsTaxonomy.load()
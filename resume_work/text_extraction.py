@@ -0,0 +1,456 @@
+# text_extraction.py
+import io
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+# python-docx, Pillow and pytesseract are imported where they are used:
+# most runs never OCR a page, and each extraction worker process would
+# otherwise pay their import time at start-up.
+
+logger = logging.getLogger(__name__)
+
+# Optional: Set Tesseract path if not in PATH
+# import pytesseract; pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+# OCR renders each page at OCR_LOW_DPI first and only re-renders at
+# OCR_HIGH_DPI when Tesseract's mean word confidence is below the threshold.
+OCR_LOW_DPI = 150
+OCR_HIGH_DPI = 300
+OCR_MIN_CONFIDENCE = 60.0
+
+# Size of the extraction pool this process is a worker of (1 outside pools);
+# set by _init_worker so per-document OCR threads share the CPUs with it
+_pool_workers = 1
+
+
+# -------------------------------
+# Single-document extractors
+# -------------------------------
+def extract_text_from_pdf(content: bytes) -> str:
+    """
+    Extract text from PDF using PyMuPDF.
+    Pages without a text layer are OCR'd individually.
+    """
+    return extract_pdf_document(content)["text"]
+
+
+def extract_pdf_document(content: bytes, ocr_workers: Optional[int] = None) -> Dict:
+    """
+    Extract a PDF page by page: pages with a text layer keep their PyMuPDF
+    text, image-only pages are OCR'd, blank pages are skipped.
+    :return: {"text": str, "ocr_pages": List[int], "ocr_errors": {page: error},
+        "timings": {"pdf_text": s, "ocr_page": [s, ...]}} with 1-based page
+        numbers; ocr_pages lists only pages OCR read text from, the image-only
+        pages it failed on or found no text in are in ocr_errors
+    """
+    start = time.perf_counter()
+    timings = {"pdf_text": 0.0}
+    try:
+        doc = fitz.open(stream=io.BytesIO(content), filetype="pdf")
+    except Exception as e:
+        logger.warning(f"PDF text extraction failed: {e}")
+        return {"text": "", "ocr_pages": [], "ocr_errors": {}, "timings": {"pdf_text": time.perf_counter() - start}}
+
+    page_texts: Dict[int, str] = {}
+    scanned: List[int] = []
+    ocr_errors: Dict[int, str] = {}
+    try:
+        for page in doc:
+            page_text = page.get_text("text")
+            if page_text.strip():
+                page_texts[page.number] = page_text
+            elif page.get_images():
+                scanned.append(page.number)
+        timings["pdf_text"] = time.perf_counter() - start
+
+        if scanned:
+            logger.info(f"📄 No text layer on {len(scanned)} of {doc.page_count} pages. Running OCR...")
+            timings["ocr_page"] = []
+            try:
+                page_texts.update(_ocr_pages(doc, scanned, ocr_workers or default_ocr_workers(),
+                                             OCR_LOW_DPI, OCR_HIGH_DPI, OCR_MIN_CONFIDENCE,
+                                             page_timings=timings["ocr_page"], page_errors=ocr_errors))
+            except Exception as e:
+                logger.error(f"OCR failed: {e}")
+                ocr_errors.update({index: str(e) for index in scanned if index not in page_texts})
+    except Exception as e:
+        logger.warning(f"PDF text extraction failed: {e}")
+    finally:
+        doc.close()
+
+    text = "".join(page_texts[i] + "\n" for i in sorted(page_texts) if page_texts[i].strip())
+    ocr_pages = [i + 1 for i in scanned if i not in ocr_errors and page_texts.get(i, "").strip()]
+    ocr_errors.update({i: "No text found" for i in scanned if i not in ocr_errors and i + 1 not in ocr_pages})
+    if ocr_errors:
+        logger.warning(f"⚠️ OCR failed on {len(ocr_errors)} of {len(scanned)} scanned page(s): "
+                       + "; ".join(f"p. {i + 1}: {error}" for i, error in sorted(ocr_errors.items())))
+    if text.strip():
+        logger.info(f"✅ Extracted {len(text)} characters from PDF ({len(ocr_pages)} page(s) OCR'd)")
+    return {"text": text, "ocr_pages": ocr_pages,
+            "ocr_errors": {i + 1: error for i, error in sorted(ocr_errors.items())}, "timings": timings}
+
+
+def extract_text_from_docx(content: bytes) -> str:
+    """
+    Extract text from .docx file.
+    """
+    try:
+        from docx import Document
+        doc = Document(io.BytesIO(content))
+        paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
+        text = "\n".join(paragraphs)
+        logger.info(f"✅ Extracted {len(text)} characters from DOCX")
+        return text
+    except Exception as e:
+        logger.warning(f"DOCX extraction failed: {e}")
+        return ""
+
+
+def extract_text_with_ocr(content: bytes, workers: Optional[int] = None,
+                          low_dpi: int = OCR_LOW_DPI, high_dpi: int = OCR_HIGH_DPI,
+                          min_confidence: float = OCR_MIN_CONFIDENCE) -> str:
+    """
+    Use OCR to extract text from scanned PDFs.
+    Pages are rendered one at a time with PyMuPDF and OCR'd concurrently by
+    Tesseract; at most ``2 * workers`` page images are held in memory. Pages
+    with poor confidence at ``low_dpi`` are re-rendered once at ``high_dpi``.
+    """
+    try:
+        doc = fitz.open(stream=io.BytesIO(content), filetype="pdf")
+    except Exception as e:
+        logger.error(f"OCR failed: {e}")
+        return ""
+
+    try:
+        page_texts = _ocr_pages(doc, range(doc.page_count), workers or default_ocr_workers(),
+                                low_dpi, high_dpi, min_confidence)
+    except Exception as e:
+        logger.error(f"OCR failed: {e}")
+        return ""
+    finally:
+        doc.close()
+
+    text = ""
+    for i, page_text in sorted(page_texts.items()):
+        if page_text.strip():
+            text += f"Page {i+1}:\n{page_text}\n\n"
+        else:
+            logger.info(f"❌ OCR found no text on page {i+1}")
+    text = text.strip()
+    if text:
+        logger.info(f"✅ OCR succeeded: extracted {len(text)} characters")
+    else:
+        logger.warning("❌ OCR returned no text")
+    return text
+
+
+def default_ocr_workers() -> int:
+    """
+    Concurrent Tesseract calls per document (override with CV_SCANNER_OCR_WORKERS):
+    the CPUs left per extraction worker, at most 4.
+    """
+    configured = os.environ.get("CV_SCANNER_OCR_WORKERS")
+    if configured and configured.isdigit() and int(configured) > 0:
+        return int(configured)
+    return max(1, min(4, (os.cpu_count() or 1) // _pool_workers))
+
+
+def _render_page(doc, page_index: int, dpi: int) -> "Image.Image":
+    """Render a single page to a grayscale PIL image."""
+    from PIL import Image
+    pix = doc[page_index].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+
+
+def _ocr_image(img: "Image.Image") -> Tuple[str, float]:
+    """
+    OCR one page image; returns (text, mean word confidence 0-100).
+    """
+    import pytesseract
+    data = pytesseract.image_to_data(img, lang='eng', output_type=pytesseract.Output.DICT)
+    lines: Dict[tuple, List[str]] = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        if conf < 0 or not word.strip():
+            continue
+        confidences.append(conf)
+        line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(line_key, []).append(word)
+    text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+    confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, confidence
+
+
+def _ocr_pages(doc, page_indices, workers: int, low_dpi: int, high_dpi: int,
+               min_confidence: float, page_timings: Optional[List[float]] = None,
+               page_errors: Optional[Dict[int, str]] = None) -> Dict[int, str]:
+    """
+    Stream pages through a Tesseract thread pool.
+    Rendering stays on the calling thread (MuPDF is not thread-safe); the
+    Tesseract subprocess calls run concurrently. Extraction workers run
+    Tesseract single-threaded (see _init_worker); when OCR runs in the host
+    process, set OMP_THREAD_LIMIT=1 at startup for the same effect.
+    :param page_timings: If given, the render + OCR time (including a
+        high-DPI retry) of each page OCR read text from is appended to it
+    :param page_errors: If given, pages whose render or Tesseract call failed
+        are recorded in it (page index -> error) instead of failing the document
+    """
+    page_queue = list(page_indices)
+    max_in_flight = max(1, workers) * 2
+    page_texts: Dict[int, str] = {}
+    pending = {}
+    page_started: Dict[int, float] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while page_queue or pending:
+            while page_queue and len(pending) < max_in_flight:
+                index = page_queue.pop(0)
+                page_started[index] = time.perf_counter()
+                try:
+                    img = _render_page(doc, index, low_dpi)
+                except Exception as e:
+                    _page_failed(index, e, page_errors)
+                    continue
+                pending[pool.submit(_ocr_image, img)] = (index, low_dpi)
+                del img
+            if not pending:
+                continue
+
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                index, dpi = pending.pop(future)
+                try:
+                    text, confidence = future.result()
+                except Exception as e:
+                    _page_failed(index, e, page_errors)
+                    continue
+                if confidence < min_confidence and dpi < high_dpi:
+                    logger.info(f"🔁 Page {index+1} OCR confidence {confidence:.0f} at {dpi} DPI, "
+                                f"retrying at {high_dpi} DPI")
+                    try:
+                        img = _render_page(doc, index, high_dpi)
+                    except Exception:
+                        img = None
+                    if img is not None:
+                        pending[pool.submit(_ocr_image, img)] = (index, high_dpi)
+                        del img
+                        continue
+                page_texts[index] = text
+                if page_timings is not None and text.strip():
+                    page_timings.append(time.perf_counter() - page_started[index])
+    return page_texts
+
+
+def _page_failed(index: int, error: Exception, page_errors: Optional[Dict[int, str]]):
+    if page_errors is None:
+        raise error
+    logger.warning(f"⚠️ OCR failed on page {index + 1}: {error}")
+    page_errors[index] = str(error) or type(error).__name__
+
+
+def extract_text(content: bytes, file_format: str) -> str:
+    """
+    Extract text from PDF or DOCX bytes; returns "" on failure.
+    """
+    if not content or len(content) == 0:
+        logger.warning("Empty file content.")
+        return ""
+
+    try:
+        if file_format == "pdf":
+            return extract_text_from_pdf(content)
+        elif file_format == "docx":
+            return extract_text_from_docx(content)
+        else:
+            logger.warning(f"Unsupported format: {file_format}")
+            return ""
+    except Exception as e:
+        logger.error(f"Error in extract_text: {e}")
+        return ""
+
+
+def extract_document(content: bytes, file_format: str) -> Dict:
+    """
+    Like extract_text, but also reports which PDF pages needed OCR and how
+    long each extraction stage took.
+    :return: {"text": str, "ocr_pages": List[int], "ocr_errors": Dict[int, str],
+        "timings": Dict[str, float | List[float]]}
+    """
+    if file_format == "pdf" and content:
+        return extract_pdf_document(content)
+    start = time.perf_counter()
+    text = extract_text(content, file_format)
+    timings = {"docx": time.perf_counter() - start} if file_format == "docx" and content else {}
+    return {"text": text, "ocr_pages": [], "ocr_errors": {}, "timings": timings}
+
+
+def extract_pdf_file_text(file_path: str) -> str:
+    """
+    Raw PyMuPDF text of a PDF on disk (no OCR), as used by the CV Parser.
+    """
+    doc = fitz.open(file_path)
+    try:
+        text = ""
+        for page in doc:
+            text += page.get_text()
+        return text
+    finally:
+        doc.close()
+
+
+# -------------------------------
+# Parallel extraction stage
+# -------------------------------
+def default_workers() -> int:
+    """Worker count for extraction pools (override with CV_SCANNER_WORKERS)."""
+    configured = os.environ.get("CV_SCANNER_WORKERS")
+    if configured and configured.isdigit() and int(configured) > 0:
+        return int(configured)
+    return os.cpu_count() or 1
+
+
+def _init_worker(pool_workers: int):
+    global _pool_workers
+    _pool_workers = pool_workers
+    # Each Tesseract call is single-threaded; the OCR threads provide the
+    # parallelism. Only this worker's environment (inherited by its Tesseract
+    # subprocesses) is changed, never the host's.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+class ExtractionPool:
+    """
+    Extraction process pool shared by every run_in_pool call of one run, so
+    worker start-up is paid once rather than per chunk.
+
+    Workers are started with the "spawn" method: callers (Streamlit, the job
+    runner, torch) are multithreaded, and forking while other threads hold
+    locks can deadlock the children. A pool whose workers were terminated
+    after a timeout or crash is replaced on next use. With a single worker,
+    run_in_pool runs items inline and no process is started.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = max(1, workers or default_workers())
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._closed = False
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._closed:
+            raise RuntimeError("ExtractionPool is closed")
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker, initargs=(self.workers,))
+        return self._executor
+
+    def discard(self):
+        """Stop the current workers (e.g. one is hung); a new pool starts on next use."""
+        if self._executor is not None:
+            _terminate_workers(self._executor)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def close(self):
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "ExtractionPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_in_pool(func: Callable, args_list: Sequence[tuple], workers: Optional[int] = None,
+                timeout: Optional[float] = None,
+                progress_callback: Optional[Callable[[int, int], None]] = None,
+                pool: Optional[ExtractionPool] = None) -> List[Tuple[object, Optional[str]]]:
+    """
+    Run ``func(*args)`` for every args tuple across extraction processes.
+    Returns ``(result, error)`` pairs in input order. A crash, exception or
+    timeout in one item is reported as that item's error and never aborts
+    the rest of the batch.
+    :param func: Module-level (picklable) function
+    :param workers: Number of processes; defaults to default_workers()
+    :param timeout: Seconds to wait for each item once earlier items are done
+    :param progress_callback: Called as (done, total) after every item
+    :param pool: ExtractionPool to reuse; without one a pool is started and
+        closed for this call (or items run inline for a single worker)
+    """
+    total = len(args_list)
+    outcomes: List[Tuple[object, Optional[str]]] = [(None, None)] * total
+    workers = pool.workers if pool is not None else min(workers or default_workers(), total)
+    if workers <= 1:
+        for i, args in enumerate(args_list):
+            try:
+                outcomes[i] = (func(*args), None)
+            except Exception as e:
+                outcomes[i] = (None, str(e))
+            if progress_callback:
+                progress_callback(i + 1, total)
+        return outcomes
+    if pool is None:
+        with ExtractionPool(workers) as own_pool:
+            return run_in_pool(func, args_list, timeout=timeout, progress_callback=progress_callback,
+                               pool=own_pool)
+    if not total:
+        return outcomes
+
+    crashed = []
+    broken = False
+    try:
+        futures = [pool.executor.submit(func, *args) for args in args_list]
+        for i, future in enumerate(futures):
+            try:
+                outcomes[i] = (future.result(timeout=timeout), None)
+            except FutureTimeoutError:
+                future.cancel()
+                broken = True
+                outcomes[i] = (None, f"Timed out after {timeout}s")
+            except BrokenProcessPool:
+                broken = True
+                crashed.append(i)
+            except Exception as e:
+                outcomes[i] = (None, str(e))
+            if progress_callback:
+                progress_callback(i + 1, total)
+    finally:
+        if broken:
+            pool.discard()
+
+    # A hard crash breaks the whole pool; retry the affected items one per
+    # process so only the file that actually crashes is marked as failed.
+    for i in crashed:
+        with ExtractionPool(1) as solo:
+            try:
+                outcomes[i] = (solo.executor.submit(func, *args_list[i]).result(timeout=timeout), None)
+            except FutureTimeoutError:
+                solo.discard()
+                outcomes[i] = (None, f"Timed out after {timeout}s")
+            except BrokenProcessPool:
+                solo.discard()
+                outcomes[i] = (None, "Worker process crashed")
+            except Exception as e:
+                outcomes[i] = (None, str(e))
+    return outcomes
+
+
+def _terminate_workers(pool: ProcessPoolExecutor):
+    # ProcessPoolExecutor has no public way to stop a running task, so hung
+    # workers are terminated directly before shutting the pool down.
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        if process.is_alive():
+            process.terminate()
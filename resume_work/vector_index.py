@@ -0,0 +1,247 @@
+# vector_index.py
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from resume_work.config import get_cache_directory
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeVectorIndex:
+    """
+    Persistent top-K index over resume embeddings.
+
+    Vectors live in an append-only float32 file read through a memory map,
+    metadata (content hash, file name, row) in SQLite. Search is an exact
+    dot product over the matrix by default; mode="hnsw" uses an approximate
+    hnswlib graph (optional dependency) built once, then extended with the
+    rows added since the last search.
+
+    Vectors from different encoders are not comparable even at the same
+    size, so the default directory is keyed by model, backend and dimension.
+    """
+
+    MODES = ("exact", "hnsw")
+
+    def __init__(self, directory: Optional[str] = None, dim: int = 384, mode: str = "exact",
+                 model_name: str = "all-MiniLM-L6-v2", backend: str = "torch"):
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}")
+        encoder_key = re.sub(r"[^\w.-]+", "_", f"{model_name}-{backend}-{dim}")
+        self.directory = directory or os.path.join(get_cache_directory(), "resume_index", encoder_key)
+        os.makedirs(self.directory, exist_ok=True)
+        self.dim = dim
+        self.mode = mode
+        self._vectors_path = os.path.join(self.directory, f"vectors-{dim}.f32")
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._ann = None
+        self._ann_rows = 0
+        self._ann_stale = set()  # rows whose vector changed since they were added to the graph
+
+        self._conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=30,
+                                     check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                row    INTEGER PRIMARY KEY,
+                hash   TEXT NOT NULL UNIQUE,
+                name   TEXT,
+                active INTEGER NOT NULL DEFAULT 1,
+                added  REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items WHERE active = 1").fetchone()[0]
+
+    def contains(self, keys: Sequence[str]) -> set:
+        """Subset of the given content hashes that are already indexed."""
+        found = set()
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = list(keys[start:start + 500])
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash FROM items WHERE active = 1 AND hash IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray, names: Optional[Sequence[str]] = None):
+        """
+        Insert or replace L2-normalised vectors keyed by content hash.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        names = list(names) if names is not None else [None] * len(keys)
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes SQLite's write lock, so another process
+            # sharing this directory (CLI and app) cannot claim the same rows
+            # between allocating them and writing their vectors
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = {}
+                for start in range(0, len(keys), 500):
+                    chunk = list(keys[start:start + 500])
+                    placeholders = ",".join("?" * len(chunk))
+                    existing.update(self._conn.execute(
+                        f"SELECT hash, row FROM items WHERE hash IN ({placeholders})", chunk
+                    ).fetchall())
+
+                # Rows come from the committed metadata, not the file size: an
+                # interrupted writer may have left vectors nobody owns
+                first_row = next_row = self._conn.execute("SELECT IFNULL(MAX(row) + 1, 0) FROM items").fetchone()[0]
+                appended, updates = [], []
+                for key, vector, name in zip(keys, vectors, names):
+                    if key in existing:
+                        updates.append((existing[key], vector))
+                        self._conn.execute(
+                            "UPDATE items SET name = ?, active = 1, added = ? WHERE hash = ?", (name, now, key)
+                        )
+                    else:
+                        existing[key] = next_row
+                        appended.append(vector)
+                        self._conn.execute(
+                            "INSERT INTO items (row, hash, name, added) VALUES (?, ?, ?, ?)",
+                            (next_row, key, name, now)
+                        )
+                        next_row += 1
+
+                if appended:
+                    with open(self._vectors_path, "r+b" if os.path.exists(self._vectors_path) else "wb") as f:
+                        f.seek(first_row * 4 * self.dim)
+                        f.write(np.vstack(appended).tobytes())
+                if updates:
+                    rows = max(next_row, self._row_count())
+                    matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+                    for row, vector in updates:
+                        matrix[row] = vector
+                    matrix.flush()
+                    del matrix
+                    self._ann_stale.update(row for row, _ in updates if row < self._ann_rows)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._matrix = None
+
+    def get(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Stored vectors of the given content hashes; unknown keys are omitted."""
+        found = {}
+        with self._lock:
+            rows = {}
+            for start in range(0, len(keys), 500):
+                chunk = list(keys[start:start + 500])
+                placeholders = ",".join("?" * len(chunk))
+                rows.update(self._conn.execute(
+                    f"SELECT hash, row FROM items WHERE active = 1 AND hash IN ({placeholders})", chunk
+                ).fetchall())
+            matrix = self._load_matrix() if rows else None
+            if matrix is not None:
+                found = {key: np.array(matrix[row]) for key, row in rows.items() if row < len(matrix)}
+        return found
+
+    def remove(self, keys: Sequence[str]):
+        """Hide entries from search results (rows are reused if the key is re-added)."""
+        with self._lock:
+            self._conn.executemany("UPDATE items SET active = 0 WHERE hash = ?", [(k,) for k in keys])
+            self._conn.commit()
+
+    def search(self, query: np.ndarray, top_k: int = 10) -> List[Dict]:
+        """
+        Top-K entries by cosine similarity to an L2-normalised query vector.
+        :return: [{"content_hash", "name", "similarity"}] best first
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        if top_k <= 0:
+            return []
+        with self._lock:
+            matrix = self._load_matrix()
+            if matrix is None or len(matrix) == 0:
+                return []
+            inactive = [row for (row,) in self._conn.execute("SELECT row FROM items WHERE active = 0")]
+
+            if self.mode == "hnsw":
+                rows, scores = self._ann_search(matrix, query, top_k + len(inactive))
+            else:
+                scores = matrix @ query
+                if inactive:
+                    scores[inactive] = -np.inf
+                k = min(top_k, len(scores))
+                rows = np.argpartition(scores, len(scores) - k)[-k:]
+                rows = rows[np.argsort(-scores[rows])]
+                scores = scores[rows]
+
+            placeholders = ",".join("?" * len(rows))
+            meta = dict(
+                (row, (key, name)) for row, key, name in self._conn.execute(
+                    f"SELECT row, hash, name FROM items WHERE active = 1 AND row IN ({placeholders})",
+                    [int(r) for r in rows]
+                )
+            ) if len(rows) else {}
+
+        results = []
+        for row, score in zip(rows, scores):
+            if int(row) in meta and np.isfinite(score):
+                key, name = meta[int(row)]
+                results.append({"content_hash": key, "name": name, "similarity": float(score)})
+            if len(results) == top_k:
+                break
+        return results
+
+    def _row_count(self) -> int:
+        if not os.path.exists(self._vectors_path):
+            return 0
+        return os.path.getsize(self._vectors_path) // (4 * self.dim)
+
+    def _load_matrix(self):
+        # Re-map when another process has appended rows since the last search
+        rows = self._row_count()
+        if self._matrix is None or len(self._matrix) != rows:
+            if rows == 0:
+                return None
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._matrix
+
+    def _ann_search(self, matrix, query: np.ndarray, k: int):
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError("mode='hnsw' requires the optional 'hnswlib' package") from e
+
+        if self._ann is None:
+            index = hnswlib.Index(space="ip", dim=self.dim)
+            index.init_index(max_elements=len(matrix), ef_construction=200, M=16)
+            index.add_items(np.asarray(matrix), np.arange(len(matrix)))
+            self._ann, self._ann_rows = index, len(matrix)
+            self._ann_stale.clear()
+            logger.info(f"✅ Built HNSW index over {len(matrix)} resumes")
+        elif len(matrix) > self._ann_rows:
+            # Insert only the new rows; capacity grows geometrically so a
+            # stream of small batches does not resize every time
+            if len(matrix) > self._ann.get_max_elements():
+                self._ann.resize_index(max(len(matrix), 2 * self._ann.get_max_elements()))
+            self._ann.add_items(np.asarray(matrix[self._ann_rows:]), np.arange(self._ann_rows, len(matrix)))
+            logger.info(f"✅ Added {len(matrix) - self._ann_rows} resumes to the HNSW index")
+            self._ann_rows = len(matrix)
+        if self._ann_stale:
+            # Re-adding an existing label replaces its vector in the graph
+            rows = np.array(sorted(self._ann_stale))
+            self._ann.add_items(np.asarray(matrix[rows]), rows)
+            self._ann_stale.clear()
+        k = min(k, len(matrix))
+        self._ann.set_ef(max(50, k * 2))
+        labels, distances = self._ann.knn_query(query, k=k)
+        # hnswlib's inner-product distance is 1 - dot
+        return labels[0], 1.0 - distances[0]
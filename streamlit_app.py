@@ -6,15 +6,24 @@ from resume_work import config
 
 # Import modules
 try:
-    from resume_work.email_sender import DEFAULT_EMAIL_TEMPLATE, OutlookEmailSender
+    from resume_work.email_outbox import EmailOutbox, OutboxWorker, job_key_for
+    from resume_work.email_sender import DEFAULT_EMAIL_TEMPLATE
+    from resume_work.email_templates import DEFAULT_VALUES, PLACEHOLDER_COLUMNS, EmailTemplate, TemplateError
     from resume_work.resume_Parse import ResumeParser
+    from resume_work.results_store import (
+        CONTACT_COLUMNS, PARSED, SCORES, ResultsStore, display_scores, ordinal_ranks, ranked_view
+    )
     from resume_work.config import get_save_directory
 except ImportError as e:
     st.error(f"❌ Failed to import Outlook modules: {e}")
     st.stop()
 
 try:
-    from model_handling import UniversalResumeAnalyzer
+    from model_handling import UniversalResumeAnalyzer, default_encoder_backend
+    from resume_work.embedding_cache import EmbeddingCache
+    from resume_work.jobs import JobRunner
+    from resume_work.metrics import METRICS
+    from resume_work.vector_index import ResumeVectorIndex
 except ImportError as e:
     st.error(f"❌ Failed to import AI model: {e}")
     st.stop()
@@ -38,17 +47,55 @@ app_mode = st.sidebar.radio(
     help="Switch between app sections"
 )
 
+@st.cache_resource
+def get_results_store():
+    return ResultsStore()
+
+def rank_results(df):
+    """Scored rows without failures, best first, with an ordinal Rank column."""
+    df = df.drop(columns=["OCR Pages"], errors="ignore")
+
+    # Safe filtering - handle NaN and None values
+    if 'Error' in df.columns:
+        df = df[~df['Error'].notna()]
+        df = df.drop(columns=['Error'], errors='ignore')
+
+    if not df.empty:
+        # Safe sorting with fillna to handle None values
+        df['Overall Match Score'] = pd.to_numeric(df['Overall Match Score'], errors='coerce').fillna(0.0)
+        df = df.sort_values("Overall Match Score", ascending=False).reset_index(drop=True)
+        df["Rank"] = ordinal_ranks(len(df))
+    return df
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_ranked_view(parsed_run_id, scores_run_id):
+    """Final ranked table of one (parse run, evaluation run) pair, joined on content hash once."""
+    store = get_results_store()
+    parsed = store.read_parsed(parsed_run_id, columns=["ContentHash", *CONTACT_COLUMNS]) if parsed_run_id else None
+    return ranked_view(display_scores(store.read_scores(scores_run_id, include_errors=False)), parsed)
+
 # -------------------------------
 # Session State Initialization
 # -------------------------------
+# New sessions start from the latest stored parse and evaluation runs
 if 'results_df' not in st.session_state:
+    latest_scores = get_results_store().latest_run(SCORES)
     st.session_state['results_df'] = pd.DataFrame()
+    st.session_state['results_run_id'] = None
+    if latest_scores:
+        st.session_state['results_df'] = rank_results(display_scores(
+            get_results_store().read_scores(latest_scores["run_id"], include_errors=False)
+        ))
+        st.session_state['results_run_id'] = latest_scores["run_id"]
+        st.session_state['results_job_key'] = job_key_for(latest_scores.get("job_description", ""))
 if 'parsed_df' not in st.session_state:
-    st.session_state['parsed_df'] = pd.DataFrame()
+    latest_parse = get_results_store().latest_run(PARSED)
+    st.session_state['parsed_run_id'] = latest_parse["run_id"] if latest_parse else None
+    st.session_state['parsed_df'] = get_results_store().read_parsed(st.session_state['parsed_run_id'])
 if 'analysis_done' not in st.session_state:
-    st.session_state['analysis_done'] = False
+    st.session_state['analysis_done'] = not st.session_state['results_df'].empty
 if 'parse_done' not in st.session_state:
-    st.session_state['parse_done'] = False
+    st.session_state['parse_done'] = not st.session_state['parsed_df'].empty
 if 'email_account' not in st.session_state:
     st.session_state['email_account'] = 'your-email@bitskraft.com'
 
@@ -64,6 +111,23 @@ def get_save_path():
     except Exception:
         return None
 
+@st.cache_resource
+def get_text_cache():
+    # Shared by the CV Parser and AI Evaluator so each file is extracted once
+    return EmbeddingCache(backend=default_encoder_backend())
+
+@st.cache_resource
+def get_email_outbox():
+    return EmailOutbox()
+
+@st.cache_resource
+def get_outbox_worker():
+    # Delivers queued emails independently of script reruns
+    return OutboxWorker(get_email_outbox()).start()
+
+# Started with the app so emails queued before a restart are still delivered
+get_outbox_worker()
+
 def save_path_to_config(path):
     try:
         save_path = Path(path).resolve()
@@ -123,19 +187,20 @@ if app_mode == "📧  CV Parser":
     if st.button("🔄 Parse All Resumes", key="parse"):
         with st.spinner("🔍 Parsing PDFs..."):
             try:
-                parser = ResumeParser(save_dir=str(SAVE_DIR), output_file=str(OUTPUT_CSV))
+                parser = ResumeParser(save_dir=str(SAVE_DIR), output_file=str(OUTPUT_CSV),
+                                      cache=get_text_cache())
                 parser.parse_pdfs()
+                # candidates.csv stays as an export; the session reads the stored run
                 parser.save_to_excel()
-                if OUTPUT_CSV.exists():
-                    df = pd.read_csv(OUTPUT_CSV)
-                    if df is not None and not df.empty:
-                        st.session_state['parsed_df'] = df
-                        st.session_state['parse_done'] = True
-                        st.success(f"✅ Parsing complete! Found {len(df)} candidates.")
-                    else:
-                        st.warning("⚠️ CSV file is empty or contains no valid data.")
+                run_id = parser.save_to_store(get_results_store())
+                if run_id:
+                    df = get_results_store().read_parsed(run_id)
+                    st.session_state['parsed_df'] = df
+                    st.session_state['parsed_run_id'] = run_id
+                    st.session_state['parse_done'] = True
+                    st.success(f"✅ Parsing complete! Found {len(df)} candidates.")
                 else:
-                    st.warning("⚠️ No CSV file created. Check if any PDFs were parsed.")
+                    st.warning("⚠️ No resumes were parsed. Check if the folder contains PDFs.")
                 st.rerun()
             except Exception as e:
                 st.error(f"❌ Parsing failed: {e}")
@@ -164,9 +229,125 @@ elif app_mode == "🧠 AI Resume Evaluator":
     @st.cache_resource
     def get_analyzer():
         st.info("📥 Loading AI model... (first run may take ~30 sec)")
-        return UniversalResumeAnalyzer()
+        # Long CVs are scored over token windows (mean of the 3 best chunks)
+        analyzer = UniversalResumeAnalyzer(cache=get_text_cache(), chunk_pooling="topk")
+        analyzer.warm_up()
+        return analyzer
+
+    @st.cache_resource
+    def get_resume_index():
+        return ResumeVectorIndex(dim=analyzer.model.get_sentence_embedding_dimension(),
+                                 model_name=analyzer.model_name, backend=analyzer.backend)
+
+    @st.cache_resource
+    def get_job_runner():
+        return JobRunner(analyzer, index=resume_index, store=get_results_store())
 
     analyzer = get_analyzer()
+    resume_index = get_resume_index()
+    job_runner = get_job_runner()
+
+    def show_stage_timings(summary):
+        """Per-stage timing table; the share column shows where the time goes."""
+        if not summary:
+            return
+        total = sum(stats["total_s"] for stats in summary.values()) or 1.0
+        st.dataframe(pd.DataFrame([{
+            "Stage": stage,
+            "Count": stats["count"],
+            "Total (s)": round(stats["total_s"], 2),
+            "Share": f"{stats['total_s'] / total:.0%}",
+            "Mean (ms)": round(stats["mean_ms"], 1),
+            "p95 (ms)": round(stats["p95_ms"], 1),
+            "Max (ms)": round(stats["max_ms"], 1),
+        } for stage, stats in summary.items()]), use_container_width=True, hide_index=True)
+
+    def load_job_results(job):
+        """Rank a finished job's rows into the session's AI results."""
+        with METRICS.time("merge"):
+            rank_job_results(job)
+
+    def rank_job_results(job):
+        df = rank_results(job.results_frame())
+        if not df.empty:
+            st.session_state['results_df'] = df
+            st.session_state['results_run_id'] = job.id if get_results_store().has_run(SCORES, job.id) else None
+            st.session_state['results_job_key'] = job_key_for(job.job_description)
+            st.session_state['analysis_done'] = True
+        else:
+            st.session_state['analysis_done'] = False
+
+    def show_job_summary(job):
+        if job.status == "failed":
+            st.error(f"❌ AI evaluation failed: {job.error}")
+        elif job.status == "cancelled":
+            st.warning(f"⏹️ Evaluation cancelled after {job.done}/{job.total} resumes.")
+
+        rows = job.load_results()
+        failures = [row for row in rows if row.get("Error")]
+        if failures:
+            with st.expander(f"⚠️ {len(failures)} file(s) could not be scored"):
+                for row in failures:
+                    st.write(f"- {row['Resume Name']}: {row['Error']}")
+        if rows and len(failures) == len(rows):
+            st.warning("⚠️ No valid resumes were processed.")
+
+        ocr_rows = [row for row in rows if row.get("OCR Pages") and not row.get("Error")]
+        if ocr_rows:
+            st.caption(
+                f"🔎 OCR applied in {len(ocr_rows)} file(s): "
+                + "; ".join(f"{row['Resume Name']} (p. {row['OCR Pages']})" for row in ocr_rows[:10])
+                + (" ..." if len(ocr_rows) > 10 else "")
+            )
+
+        with st.expander("⏱️ Stage timings for this evaluation"):
+            show_stage_timings(job.metrics)
+
+    @st.fragment(run_every=2)
+    def show_job_status():
+        job = job_runner.get(st.session_state.get('eval_job_id') or "")
+        if job is None:
+            return
+
+        if job.status in ("queued", "running"):
+            st.progress(job.progress, text=f"⏳ {job.status.title()}: {job.done}/{job.total} resumes scored")
+            if st.button("⏹️ Cancel Evaluation", key=f"cancel_{job.id}"):
+                job_runner.cancel(job.id)
+            with st.expander("⏱️ Stage timings so far"):
+                show_stage_timings(job.metrics)
+            partial = [row for row in job.load_results() if not row.get("Error")]
+            if partial:
+                st.dataframe(
+                    pd.DataFrame(partial).drop(columns=["OCR Pages"], errors="ignore")
+                    .sort_values("Overall Match Score", ascending=False).head(20),
+                    use_container_width=True
+                )
+        elif st.session_state.get('loaded_job_id') != job.id:
+            # Finished since the last poll: load results and redraw the whole page
+            st.session_state['loaded_job_id'] = job.id
+            load_job_results(job)
+            st.rerun(scope="app")
+        else:
+            show_job_summary(job)
+
+    # Jobs queued by any session; finished ones can be reopened here
+    recent_jobs = job_runner.jobs()
+    if recent_jobs:
+        with st.expander(f"🗂️ Evaluation jobs ({len(recent_jobs)})"):
+            for job in recent_jobs[:20]:
+                cols = st.columns([4, 2, 1])
+                cols[0].write(f"**{job.label or job.id}** — {job.job_description[:60].strip()}...")
+                cols[1].write(f"{job.status} · {job.done}/{job.total}")
+                if cols[2].button("Open", key=f"open_{job.id}"):
+                    st.session_state['eval_job_id'] = job.id
+                    st.session_state['loaded_job_id'] = None
+                    st.rerun()
+
+    # Cumulative timings for this server process (also written as Prometheus text)
+    with st.expander("📈 Pipeline metrics since server start"):
+        show_stage_timings(METRICS.summary())
+        st.download_button("⬇️ Prometheus metrics", data=METRICS.to_prometheus(),
+                           file_name="metrics.prom", mime="text/plain")
 
     # Job Description
     st.markdown("### 📝 Job Requirements")
@@ -179,6 +360,27 @@ elif app_mode == "🧠 AI Resume Evaluator":
     if not job_description.strip():
         st.info("💡 Please enter job requirements to begin.")
     else:
+        # Retrieve candidates from resumes evaluated in earlier runs
+        indexed_count = len(resume_index)
+        if indexed_count:
+            with st.expander(f"🗂️ Search {indexed_count} previously evaluated resumes"):
+                index_top_k = st.number_input("Top candidates to retrieve", min_value=1, max_value=500, value=20)
+                if st.button("🔎 Search Index"):
+                    hits = analyzer.top_candidates(resume_index, job_description, top_k=int(index_top_k))
+                    if hits:
+                        hits_df = pd.DataFrame(hits).rename(columns={
+                            "name": "Resume Name",
+                            "overall_match_score": "Overall Match Score",
+                            "keywords_matched": "Keywords Matched",
+                            "semantic_relevance": "Semantic Relevance",
+                            "summary": "Summary",
+                        })
+                        hits_df["Keywords Matched"] = hits_df["Keywords Matched"].str.join(", ")
+                        st.dataframe(hits_df[["Resume Name", "Overall Match Score", "Keywords Matched",
+                                              "Semantic Relevance", "Summary"]], use_container_width=True)
+                    else:
+                        st.info("No indexed resumes found.")
+
         st.markdown("### 📎 Upload Resumes (PDF/DOCX)")
         uploaded_files = st.file_uploader(
             "Upload up to 1,000 resumes",
@@ -199,103 +401,19 @@ elif app_mode == "🧠 AI Resume Evaluator":
                 st.error("❌ Total file size exceeds 100 MB limit.")
             else:
                 if st.button("🚀 Start AI Evaluation", type="primary"):
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-
-                    results = []
-                    for i, file in enumerate(uploaded_files):
-                        filename = file.name
-                        status_text.text(f"Processing {i+1}/{total_files}: {filename}")
-
-                        try:
+                    def read_uploads():
+                        for file in uploaded_files:
                             file.seek(0)
-                            content = file.read()
-
-                            # Determine format
-                            if filename.lower().endswith(".pdf"):
-                                file_format = "pdf"
-                            elif filename.lower().endswith(".docx"):
-                                file_format = "docx"
-                            else:
-                                result = {
-                                    "Resume Name": filename,
-                                    "Error": "Unsupported file type",
-                                    "Overall Match Score": 0.0,
-                                    "Keywords Matched": "",
-                                    "Semantic Relevance": 0.0,
-                                    "Summary": "Unsupported format"
-                                }
-                                results.append(result)
-                                continue
-
-                            # Extract text
-                            text = analyzer.extract_text(content, file_format)
-                            if not text or not text.strip():
-                                result = {
-                                    "Resume Name": filename,
-                                    "Error": "No text extracted",
-                                    "Overall Match Score": 0.0,
-                                    "Keywords Matched": "",
-                                    "Semantic Relevance": 0.0,
-                                    "Summary": "Empty or unreadable content"
-                                }
-                                results.append(result)
-                                st.warning(f"⚠️ No text extracted from {filename}")
-                                continue
-
-                            # Analyze resume
-                            analysis = analyzer.analyze_resume(text, job_description)
-                            
-                            # Safe extraction with None checks
-                            overall_score = analysis.get("overall_match_score", 0.0)
-                            keywords = analysis.get("keywords_matched", [])
-                            semantic_score = analysis.get("semantic_relevance", 0.0)
-                            summary = analysis.get("summary", "No summary available")
-                            
-                            # Convert None values to safe defaults
-                            result = {
-                                "Resume Name": filename,
-                                "Overall Match Score": float(overall_score) if overall_score is not None else 0.0,
-                                "Keywords Matched": ", ".join(keywords) if keywords else "",
-                                "Semantic Relevance": float(semantic_score) if semantic_score is not None else 0.0,
-                                "Summary": summary if summary else "No summary available"
-                            }
-                            results.append(result)
-
-                        except Exception as e:
-                            st.error(f"❌ Failed to process {filename}: {e}")
-                            result = {
-                                "Resume Name": filename,
-                                "Error": str(e),
-                                "Overall Match Score": 0.0,
-                                "Keywords Matched": "",
-                                "Semantic Relevance": 0.0,
-                                "Summary": "Processing failed"
-                            }
-                            results.append(result)
-
-                        progress_bar.progress((i + 1) / total_files)
-
-                    # Convert to DataFrame
-                    df = pd.DataFrame(results)
-
-                    # Safe filtering - handle NaN and None values
-                    if 'Error' in df.columns:
-                        df = df[~df['Error'].notna()]
-                        df = df.drop(columns=['Error'], errors='ignore')
-
-                    if df.empty:
-                        st.warning("⚠️ No valid resumes were processed.")
-                    else:
-                        # Safe sorting with fillna to handle None values
-                        df['Overall Match Score'] = pd.to_numeric(df['Overall Match Score'], errors='coerce').fillna(0.0)
-                        df = df.sort_values("Overall Match Score", ascending=False).reset_index(drop=True)
-                        df["Rank"] = df.index.map(lambda x: f"{x+1}{'st' if x==0 else 'nd' if x==1 else 'rd' if x==2 else 'th'}")
-                        st.session_state['results_df'] = df
-                        st.session_state['analysis_done'] = True
+                            yield file.name, file.read()
+
+                    # Scoring runs on the shared background runner, so it keeps going
+                    # across reruns and other sessions can queue their own jobs
+                    job = job_runner.submit(job_description, read_uploads(),
+                                            label=f"{total_files} resume(s)")
+                    st.session_state['eval_job_id'] = job.id
+                    st.session_state['analysis_done'] = False
 
-                    status_text.text("✅ AI Analysis Complete!")
-                    progress_bar.empty()
+        show_job_status()
 
         # Display results
         if st.session_state.get('analysis_done', False):
@@ -341,40 +459,16 @@ elif app_mode == "🏆 Final Ranked Results":
     # Get email account from session state
     email_account = st.session_state.get('email_account', 'your-email@bitskraft.com')
     
-    parsed_df = st.session_state['parsed_df']
     ai_df = st.session_state['results_df']
 
-    if (st.session_state.get('parse_done', False) and 
-        st.session_state.get('analysis_done', False) and 
-        not parsed_df.empty and not ai_df.empty):
-        
-        # Rename and ensure columns exist
-        if 'FileName' in parsed_df.columns:
-            parsed_df_renamed = parsed_df.rename(columns={"FileName": "Resume Name"})
+    if st.session_state.get('analysis_done', False) and not ai_df.empty:
+
+        # Joined on content hash and ranked once per (parse run, evaluation run);
+        # reruns only re-slice the cached table
+        if st.session_state.get('results_run_id'):
+            final_df = load_ranked_view(st.session_state.get('parsed_run_id'), st.session_state['results_run_id'])
         else:
-            st.error("❌ Parsed data missing 'FileName' column.")
-            st.stop()
-
-        required_cols = ["Name", "Phone", "Email", "LinkedIn", "GitHub"]
-        for col in required_cols:
-            if col not in parsed_df_renamed.columns:
-                parsed_df_renamed[col] = "Not available"
-
-        # Merge
-        merged_df = pd.merge(ai_df, parsed_df_renamed, on="Resume Name", how="left")
-
-        # Select and rename early
-        columns_to_keep = [
-            "Rank", "Name", "Phone", "Email", "LinkedIn", "GitHub",
-            "Overall Match Score", "Keywords Matched", "Semantic Relevance", "Resume Name"
-        ]
-        final_df = merged_df[[col for col in columns_to_keep if col in merged_df.columns]].copy()
-
-        # Ensure numeric score
-        if 'Overall Match Score' in final_df.columns:
-            final_df['Overall Match Score'] = pd.to_numeric(final_df['Overall Match Score'], errors='coerce').fillna(0.0)
-            final_df = final_df.sort_values("Overall Match Score", ascending=False).reset_index(drop=True)
-            final_df["Rank"] = [f"{i+1}{'st' if i==0 else 'nd' if i==1 else 'rd' if i==2 else 'th'}" for i in range(len(final_df))]
+            final_df = ranked_view(ai_df, st.session_state['parsed_df'])
 
         st.session_state['final_ranked'] = final_df
 
@@ -423,25 +517,58 @@ elif app_mode == "🏆 Final Ranked Results":
             st.markdown("---")
             st.subheader("📧 Contact Top Candidates")
             
+            email_account = st.text_input(
+                "Sender Email",
+                key="email_account",
+                help="From address; the backend is chosen by CV_SCANNER_EMAIL_BACKEND (smtp or outlook)"
+            )
+
             # Email template customization
             st.markdown("### ✉️ Email Template")
+            position = st.text_input(
+                "Position",
+                value="",
+                placeholder="e.g. Backend Engineer",
+                help="Fills {position}; left empty, it reads \"the position\""
+            )
+            placeholder_help = "Placeholders: " + ", ".join(
+                "{" + name + "}" for name in sorted(set(PLACEHOLDER_COLUMNS) | set(DEFAULT_VALUES))
+            )
             email_subject = st.text_input(
                 "Email Subject",
                 value=DEFAULT_EMAIL_TEMPLATE['subject'],
-                help="Use {position} as a placeholder for the job position"
+                help=placeholder_help
             )
             
             email_body = st.text_area(
                 "Email Body",
                 value=DEFAULT_EMAIL_TEMPLATE['body'],
                 height=300,
-                help="Use {candidate_name}, {position}, and {company_name} as placeholders"
+                help=placeholder_help
             )
+
+            with st.expander("🌐 HTML Body (optional)"):
+                email_html_body = st.text_area(
+                    "HTML Body",
+                    value="",
+                    height=200,
+                    help="Sent alongside the plain-text body; inserted values are HTML-escaped. " + placeholder_help
+                )
             
             email_template = {
                 'subject': email_subject,
-                'body': email_body
+                'body': email_body,
+                'html_body': email_html_body or None
             }
+            template_context = {"position": position}
+
+            # Parse and check placeholders once, before anything is rendered
+            try:
+                compiled_template = EmailTemplate.from_dict(email_template)
+                compiled_template.validate(final_df.columns, template_context)
+            except TemplateError as e:
+                compiled_template = None
+                st.error(f"❌ Email template: {e}")
             
             # Select number of top candidates to contact
             max_candidates = min(10, len(final_df))
@@ -453,11 +580,8 @@ elif app_mode == "🏆 Final Ranked Results":
                     value=min(5, max_candidates)
                 )
                 
-                # Get top candidates
-                top_candidates = final_df.head(num_candidates).copy()
-                
-                # Sort by score descending
-                top_candidates_sorted = top_candidates.sort_values(by='Overall Match Score', ascending=False).reset_index(drop=True)
+                # Get top candidates (final_df is already sorted by score)
+                top_candidates_sorted = final_df.head(num_candidates).reset_index(drop=True)
 
                 # Make Name and Email editable
                 display_cols = ['Name', 'Email']
@@ -508,33 +632,53 @@ elif app_mode == "🏆 Final Ranked Results":
 
                 # In your Final Ranked Results section, where you call send_bulk_emails
 
-                if st.button("🚀 Send Emails to Selected Candidates", type="primary"):
+                outbox = get_email_outbox()
+                job_key = st.session_state.get('results_job_key', "")
+
+                if st.button("🚀 Send Emails to Selected Candidates", type="primary",
+                             disabled=compiled_template is None):
+                    # Full candidate rows with the edited names and addresses
+                    recipients = top_candidates_sorted.copy()
+                    recipients[['Name', 'Email']] = edited_candidates[['Name', 'Email']]
+                    try:
+                        messages = compiled_template.messages(recipients, context=template_context)
+                    except TemplateError as e:
+                        messages = None
+                        st.error(f"❌ Email template: {e}")
+
                     if not email_account or email_account == 'your-email@bitskraft.com':
-                        st.error("Please set your Outlook email address in the AI Evaluator section first.")
-                    else:
-                        with st.spinner(f"Sending emails to {len(edited_candidates)} candidates..."):
-                            sender = OutlookEmailSender(email_account)  # ✅ Uses SMTP, works on Streamlit Cloud!
-                            successful_emails = []
-
-                            for idx, row in edited_candidates.iterrows():
-                                name = row['Name']
-                                email = row['Email']
-                                subject = email_template['subject'].format(position="Software Engineer")  # Customize as needed
-                                body = email_template['body'].format(
-                                    candidate_name=name,
-                                    position="Software Engineer",
-                                    keywords_matched=row.get('Keywords Matched', '')
-                                )
-
-                                if sender.send_email(email, subject, body=body):
-                                    successful_emails.append(email)
-
-                            if successful_emails:
-                                st.success(f"✅ Successfully sent emails to {len(successful_emails)} candidates!")
-                                for email in successful_emails:
-                                    st.write(f"- {email}")
-                            else:
-                                st.error("❌ Failed to send any emails. Please check your credentials and internet connection.")
+                        st.error("Please enter the sender email address above first.")
+                    elif messages is not None:
+                        # Queued emails are delivered by the background worker;
+                        # candidates already emailed for this job and template are skipped
+                        queued = outbox.enqueue(messages, email_account, job_key=job_key, template=email_template)
+                        get_outbox_worker().wake()
+                        if queued["queued"]:
+                            st.success(f"📬 Queued {len(queued['queued'])} email(s) for delivery.")
+                        if queued["duplicates"]:
+                            st.info(
+                                f"ℹ️ Skipped {len(queued['duplicates'])} candidate(s) already emailed or queued "
+                                f"with this template: {', '.join(queued['duplicates'])}"
+                            )
+
+                @st.fragment(run_every=2)
+                def show_outbox_status():
+                    counts = outbox.counts(job_key=job_key)
+                    if not any(counts.values()):
+                        return
+                    st.markdown("### 📬 Email Outbox")
+                    cols = st.columns(4)
+                    for col, status in zip(cols, ("queued", "sending", "sent", "failed")):
+                        col.metric(status.title(), counts[status])
+                    st.dataframe(pd.DataFrame(outbox.entries(job_key=job_key)).rename(columns={
+                        "recipient_email": "Email", "subject": "Subject", "status": "Status",
+                        "attempts": "Attempts", "error": "Error"
+                    })[["Email", "Subject", "Status", "Attempts", "Error"]], use_container_width=True)
+                    if counts["failed"] and st.button("🔁 Retry Failed Emails", key="retry_failed_emails"):
+                        outbox.retry_failed(job_key=job_key)
+                        get_outbox_worker().wake()
+
+                show_outbox_status()
 
             else:
                 st.warning("⚠️ No candidates available for emailing.")
@@ -542,10 +686,9 @@ elif app_mode == "🏆 Final Ranked Results":
             st.warning("⚠️ No candidates to display. Check parsing and AI evaluation steps.")
 
     else:
-        st.warning("⚠️ Please complete both **Outlook Parsing** and **AI Evaluation** to see final results.")
+        st.warning("⚠️ Please complete the **AI Evaluation** to see final results.")
         st.info("""
-        - Go to **📧  CV Parser** to parse resumes.
-        - Go to **🧠 AI Resume Evaluator** to analyze them.
+        - Go to **🧠 AI Resume Evaluator** to analyze resumes (contact details are extracted in the same pass).
         - Then return here to see the unified ranked list.
         """)
 